@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+from api_client import ApiClient
+
+
+class AccountConfig(BaseModel):
+    name: str
+    base_url: str
+    email: str = ''
+    token: str = ''
+    # Имя переменной окружения с токеном, чтобы не хранить его в файле
+    token_env: Optional[str] = None
+    requests_per_second: Optional[float] = None
+
+    def build_client(self, **kwargs):
+        """Отдельный клиент со своей сессией, лимитом и кэшем справочников"""
+        token = os.environ.get(self.token_env, self.token) if self.token_env else self.token
+        return ApiClient(
+            base_url=self.base_url,
+            email=self.email,
+            token=token,
+            requests_per_second=self.requests_per_second,
+            **kwargs
+        )
+
+
+class AccountResult(BaseModel):
+    account: str
+    result: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def load_accounts(path) -> List[AccountConfig]:
+    """Загрузка списка аккаунтов из JSON ({"accounts": [...]} или просто список)"""
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+    if isinstance(raw, dict):
+        raw = raw.get('accounts', [])
+    accounts = [AccountConfig(**item) for item in raw]
+    names = [account.name for account in accounts]
+    if len(names) != len(set(names)):
+        raise ValueError('Имена аккаунтов должны быть уникальными')
+    return accounts
+
+
+def _run_for_account(account, workload, client_kwargs):
+    started = time.perf_counter()
+    try:
+        client = account.build_client(**client_kwargs)
+        result = workload(client, account)
+        return AccountResult(account=account.name, result=result, elapsed=time.perf_counter() - started)
+    except Exception as e:
+        return AccountResult(account=account.name, error=repr(e), elapsed=time.perf_counter() - started)
+
+
+def fan_out(accounts, workload, max_workers=None, **client_kwargs):
+    """Параллельный запуск workload(client, account) для всех аккаунтов в одном процессе
+
+    Ошибка одного аккаунта не прерывает остальные - она попадает в его AccountResult.
+    """
+    if not accounts:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(accounts)) as executor:
+        futures = {
+            account.name: executor.submit(_run_for_account, account, workload, client_kwargs)
+            for account in accounts
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def seed_tickets(count):
+    """Workload для наполнения аккаунта тестовыми тикетами"""
+    def workload(client, account):
+        from test_data_generator import TicketDataGenerator
+
+        statuses = {}
+        for _ in range(count):
+            response = client.create_ticket(TicketDataGenerator.generate_minimal_ticket())
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        return statuses
+    return workload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Наполнение нескольких аккаунтов тикетами параллельно')
+    parser.add_argument('accounts', help='JSON-файл с аккаунтами')
+    parser.add_argument('--seed', type=int, default=10, help='Количество тикетов на аккаунт')
+    args = parser.parse_args(argv)
+
+    results = fan_out(load_accounts(args.accounts), seed_tickets(args.seed))
+    for name, result in results.items():
+        if result.error:
+            print(f"❌ {name}: {result.error} ({result.elapsed:.2f}s)")
+        else:
+            print(f"✅ {name}: {result.result} ({result.elapsed:.2f}s)")
+    return 1 if any(result.error for result in results.values()) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,13 +1,53 @@
-import requests
 import base64
+import json
+import random
+import threading
+import time
 
+from idempotency import make_idempotency_key
+from multipart import MultipartBody
+
+
+def request_not_sent(error):
+    """Ошибка установки соединения: запрос точно не дошел до сервера и его можно повторить"""
+    import requests
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    # Сброс соединения после отправки тела тоже ConnectionError, но причина у него другая
+    return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
 
 class ApiClient:
-    def __init__(self):
-        self.base_url = 'https://ooobnalshik.helpdeskeddy.com/api/v2'
-        self.email = ''
-        self.token = ''
+    DEFAULT_BASE_URL = 'https://ooobnalshik.helpdeskeddy.com/api/v2'
+
+    def __init__(self, base_url=None, email='', token='', idempotency_store=None, requests_per_second=None,
+                 concurrency=None, max_retries=0, retry_backoff=0.5, timeout=30.0):
+        self.base_url = base_url or self.DEFAULT_BASE_URL
+        self.email = email
+        self.token = token
+        # requests импортируется при создании клиента, а не при сборе тестов
+        import requests
+
         self.session = requests.Session()
+        # Собственный лимит запросов у каждого клиента (аккаунта)
+        self.min_request_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_request_at = 0.0
+        self._throttle_lock = threading.Lock()
+        self._reference_data = None
+        # Ограничитель одновременных запросов (например, AdaptiveConcurrencyController)
+        self.concurrency = concurrency
+        # Повторы запросов, которые сервер отклонил из-за перегрузки или не получил
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Таймаут соединения и ожидания ответа (секунды или кортеж (connect, read))
+        self.timeout = timeout
+        # Наблюдатели запросов: listener(method, url, status_code, elapsed)
+        self.request_listeners = []
+        # Хранилище ключ → созданный тикет; None - дедупликация отключена
+        self.idempotency_store = idempotency_store
 
         # Basic Auth encoding
         credentials = f"{self.email}:{self.token}"
@@ -18,16 +58,137 @@ class ApiClient:
             'Content-Type': 'application/json'
         })
 
-    def create_ticket(self, ticket_data):
-        """Создание нового тикета"""
+    def _throttle(self):
+        """Ожидание очередного слота с учетом лимита запросов"""
+        if not self.min_request_interval:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_request_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _request(self, method, url, **kwargs):
+        """Отправка запроса через сессию клиента
+
+        Повторяются 429 и ошибки установки соединения - запрос не был обработан.
+        5xx, таймауты и обрывы повторяются только для GET: API не дедуплицирует
+        создание тикетов (Idempotency-Key проверяет лишь сам клиент), и повтор POST
+        мог бы создать дубликат. Потоковое тело не повторяется.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        replayable = not hasattr(kwargs.get('data'), 'read')
+        for attempt in range(self.max_retries + 1):
+            can_retry = replayable and attempt < self.max_retries
+            try:
+                response = self._send(method, url, **kwargs)
+            except Exception as e:
+                if not (can_retry and (method == 'GET' or request_not_sent(e))):
+                    raise
+                self._sleep_before_retry(attempt, None)
+                continue
+            status = response.status_code
+            if can_retry and (status == 429 or (status >= 500 and method == 'GET')):
+                self._sleep_before_retry(attempt, response)
+                continue
+            return response
+
+    def _send(self, method, url, **kwargs):
+        self._throttle()
+        if self.concurrency is not None:
+            slot = self.concurrency.acquire()
+            started = slot.started
+        else:
+            started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception:
+            if self.concurrency is not None:
+                self.concurrency.release(slot, error=True)
+            self._notify_listeners(method, url, None, time.perf_counter() - started)
+            raise
+        if self.concurrency is not None:
+            self.concurrency.release(slot, response.status_code)
+        self._notify_listeners(method, url, response.status_code, time.perf_counter() - started)
+        return response
+
+    def _sleep_before_retry(self, attempt, response):
+        """Пауза перед повтором: Retry-After в секундах или экспоненциальная задержка"""
+        delay = None
+        if response is not None and response.headers.get('Retry-After'):
+            try:
+                delay = max(0.0, float(response.headers['Retry-After']))
+            except ValueError:
+                delay = None
+        if delay is None:
+            delay = min(30.0, self.retry_backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        time.sleep(delay)
+
+    def _notify_listeners(self, method, url, status_code, elapsed):
+        for listener in self.request_listeners:
+            listener(method, url, status_code, elapsed)
+
+    def create_ticket(self, ticket_data, idempotency_key=None, files=None, progress=None):
+        """Создание нового тикета
+
+        files - пути к вложениям: тело отправляется потоково как multipart/form-data,
+        метрики отправки доступны в response.upload_stats.
+        progress - необязательный callback(bytes_sent, total_bytes).
+        Заголовок Idempotency-Key отправляется, только если передан idempotency_key
+        или у клиента есть idempotency_store: ключ по содержимому одинаков между
+        прогонами, и без явной дедупликации сервер не должен возвращать старые тикеты.
+        """
+        key = idempotency_key
+        if key is None and self.idempotency_store is not None:
+            key = make_idempotency_key(ticket_data, files)
+        if key is not None and self.idempotency_store is not None:
+            ticket_id = self.idempotency_store.get(key)
+            if ticket_id is not None:
+                return self._replay_response(ticket_id)
+        key_headers = {'Idempotency-Key': key} if key is not None else {}
+
         url = f"{self.base_url}/tickets"
-        response = self.session.post(url, json=ticket_data)
+        if files:
+            body = MultipartBody(ticket_data, files, progress=progress)
+            headers = {**key_headers, 'Content-Type': body.content_type}
+            try:
+                response = self._request('POST', url, data=body, headers=headers)
+            finally:
+                body.close()
+            response.upload_stats = body.stats
+        else:
+            response = self._request('POST', url, json=ticket_data, headers=key_headers)
+        response.idempotency_key = key
+        response.idempotent_replay = False
+
+        if key is not None and self.idempotency_store is not None and response.status_code == 200:
+            try:
+                response_data = response.json()
+            except ValueError:
+                return response
+            ticket_info = self._extract_ticket_data(response_data)
+            if isinstance(ticket_info, dict) and 'id' in ticket_info:
+                self.idempotency_store.put(key, ticket_info['id'])
+        return response
+
+    def _replay_response(self, ticket_id):
+        """Ответ из хранилища идемпотентности без повторного запроса (содержит только id)"""
+        import requests
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"data": {"id": ticket_id}}).encode('utf-8')
+        response.headers['Content-Type'] = 'application/json'
+        response.encoding = 'utf-8'
+        response.url = f"{self.base_url}/tickets"
+        response.idempotent_replay = True
         return response
 
     def get_ticket(self, ticket_id):
         """Получение тикета по ID"""
         url = f"{self.base_url}/tickets/{ticket_id}"
-        response = self.session.get(url)
+        response = self._request('GET', url)
         return response
 
     def _extract_ticket_data(self, response_data):
@@ -45,7 +206,7 @@ class ApiClient:
     def get_priorities(self):
         """Получение списка приоритетов"""
         try:
-            response = self.session.get(f"{self.base_url}/priorities")
+            response = self._request('GET', f"{self.base_url}/priorities")
             return response.json() if response.status_code == 200 else []
         except:
             return []
@@ -53,7 +214,7 @@ class ApiClient:
     def get_types(self):
         """Получение списка типов"""
         try:
-            response = self.session.get(f"{self.base_url}/types")
+            response = self._request('GET', f"{self.base_url}/types")
             return response.json() if response.status_code == 200 else []
         except:
             return []
@@ -61,7 +222,7 @@ class ApiClient:
     def get_statuses(self):
         """Получение списка статусов"""
         try:
-            response = self.session.get(f"{self.base_url}/statuses")
+            response = self._request('GET', f"{self.base_url}/statuses")
             return response.json() if response.status_code == 200 else []
         except:
             return []
@@ -69,7 +230,7 @@ class ApiClient:
     def get_departments(self):
         """Получение списка департаментов"""
         try:
-            response = self.session.get(f"{self.base_url}/departments")
+            response = self._request('GET', f"{self.base_url}/departments")
             return response.json() if response.status_code == 200 else []
         except:
             return []
@@ -77,7 +238,19 @@ class ApiClient:
     def get_staff_users(self):
         """Получение списка сотрудников"""
         try:
-            response = self.session.get(f"{self.base_url}/staff")
+            response = self._request('GET', f"{self.base_url}/staff")
             return response.json() if response.status_code == 200 else []
         except:
             return []
+
+    def get_reference_data(self):
+        """Справочники аккаунта (кэшируются на время жизни клиента)"""
+        if self._reference_data is None:
+            self._reference_data = {
+                "priorities": self.get_priorities(),
+                "types": self.get_types(),
+                "statuses": self.get_statuses(),
+                "departments": self.get_departments(),
+                "staff_users": self.get_staff_users()
+            }
+        return self._reference_data
@@ -0,0 +1,334 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import ValidationError
+
+from api_client import ApiClient, request_not_sent
+from concurrency import AdaptiveConcurrencyController
+from idempotency import IdempotencyStore, make_idempotency_key
+from ticket import TicketCreate
+
+LIST_FIELDS = ('cc', 'bcc', 'followers', 'tags')
+JSON_FIELDS = ('custom_fields',)
+
+
+def _normalize_csv_row(row):
+    """Приведение строки CSV к полям TicketCreate"""
+    data = {}
+    for key, value in row.items():
+        if key is None or value is None or value == '':
+            continue
+        if key in LIST_FIELDS:
+            data[key] = [item.strip() for item in value.split(';') if item.strip()]
+        elif key in JSON_FIELDS:
+            data[key] = json.loads(value)
+        else:
+            data[key] = value
+    return data
+
+
+def _lines_with_offsets(f):
+    """Строки файла вместе с байтовой позицией после каждой строки"""
+    for line in iter(f.readline, b''):
+        yield line.decode('utf-8'), f.tell()
+
+
+class TicketSource:
+    """Потоковое чтение тикетов из CSV/JSONL с возможностью продолжить с позиции"""
+
+    def __init__(self, path, file_format=None):
+        self.path = path
+        self.format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+
+    def rows(self, start_row=0, offset=None):
+        """Генератор (номер строки, данные или исключение, позиция после строки)"""
+        with open(self.path, 'rb') as f:
+            if self.format == 'csv':
+                yield from self._csv_rows(f, start_row, offset)
+            else:
+                yield from self._jsonl_rows(f, start_row, offset)
+
+    def _csv_rows(self, f, start_row, offset):
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        if offset is not None:
+            f.seek(offset)
+        position = {'offset': f.tell()}
+
+        def lines():
+            for line, after in _lines_with_offsets(f):
+                position['offset'] = after
+                yield line
+
+        row_number = start_row
+        for values in csv.reader(lines()):
+            if not values:
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, ValueError(f'Ожидалось {len(header)} колонок, получено {len(values)}'), position['offset']
+                continue
+            try:
+                yield row_number, _normalize_csv_row(dict(zip(header, values))), position['offset']
+            except ValueError as e:
+                yield row_number, e, position['offset']
+
+    def _jsonl_rows(self, f, start_row, offset):
+        if offset is not None:
+            f.seek(offset)
+        elif f.read(3) != b'\xef\xbb\xbf':
+            f.seek(0)
+        row_number = start_row
+        for line, after in _lines_with_offsets(f):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError('Строка должна быть JSON-объектом')
+                yield row_number, data, after
+            except ValueError as e:
+                yield row_number, e, after
+
+
+class Checkpoint:
+    """Позиция последнего полностью обработанного батча"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {"row": 0, "offset": None, "created": 0, "rejected": 0}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.state.update(json.load(f))
+
+    def commit(self, **state):
+        """Атомарная запись нового состояния"""
+        self.state.update(state, updated_at=time.time())
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class TransientApiError(Exception):
+    """Сервер временно недоступен (429, 5xx, сетевая ошибка), строка не создана или ее исход неизвестен
+
+    maybe_created=True - запрос мог дойти до сервера (5xx, обрыв после отправки),
+    и тикет мог быть создан: перед продолжением импорта это нужно проверить.
+    """
+
+    def __init__(self, row_number, detail, maybe_created=False):
+        message = f"Строка {row_number}: {detail}"
+        if maybe_created:
+            message += " (тикет мог быть создан - проверьте перед продолжением)"
+        super().__init__(message)
+        self.row_number = row_number
+        self.maybe_created = maybe_created
+
+
+def _retry_after(response):
+    """Задержка из заголовка Retry-After (только в секундах), None если его нет"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def validate_row(data):
+    """Проверка строки через TicketCreate; возвращает payload только с заданными полями"""
+    ticket = TicketCreate(**data)
+    return ticket.model_dump(exclude_unset=True)
+
+
+class BulkImporter:
+    """Импорт тикетов: чтение → валидация → батчи → параллельное создание через API
+
+    После каждого батча позиция сохраняется в checkpoint. Батч, прерванный на середине,
+    при продолжении отправляется заново - повторы отсекает хранилище идемпотентности.
+    Повторяются только запросы, которые сервер точно не обработал: 429 и ошибки
+    установки соединения. У API нет дедупликации, поэтому после 5xx или обрыва
+    соединения повтор мог бы создать второй тикет - импорт останавливается без commit
+    батча (TransientApiError), как и при исчерпании повторов. В reject-файл попадают
+    только строки, отклоненные сервером как невалидные (4xx).
+    """
+
+    def __init__(self, api, source, checkpoint_path, reject_path, batch_size=100, workers=8,
+                 max_retries=5, backoff=0.5, max_backoff=30.0):
+        self.api = api
+        self.source = source
+        self.checkpoint = Checkpoint(checkpoint_path)
+        source_path = os.path.abspath(source.path)
+        if self.checkpoint.state.get('source', source_path) != source_path:
+            raise ValueError(f"Checkpoint {checkpoint_path} относится к другому файлу: {self.checkpoint.state['source']}")
+        if 'import_id' not in self.checkpoint.state:
+            # Фиксируем ID импорта сразу, чтобы ключи идемпотентности совпали при продолжении
+            self.checkpoint.commit(import_id=uuid.uuid4().hex, source=source_path)
+        self.reject_path = reject_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        if api.idempotency_store is None:
+            # При продолжении нужны только ключи незафиксированного батча
+            api.idempotency_store = IdempotencyStore(
+                max_size=max(10000, 4 * batch_size), path=f"{checkpoint_path}.keys.jsonl"
+            )
+
+    def _idempotency_key(self, row_number, payload):
+        """Ключ строки: одинаковые строки файла создают разные тикеты, повтор той же строки - нет"""
+        return make_idempotency_key({
+            "import_id": self.checkpoint.state['import_id'],
+            "row": row_number,
+            "ticket": payload
+        })
+
+    def _create(self, item):
+        row_number, payload = item
+        key = self._idempotency_key(row_number, payload)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.api.create_ticket(payload, idempotency_key=key)
+            except Exception as e:
+                if not request_not_sent(e):
+                    raise TransientApiError(row_number, repr(e), maybe_created=True) from e
+                detail = repr(e)
+            else:
+                if response.status_code == 200:
+                    return row_number, payload, response, None
+                if response.status_code >= 500:
+                    raise TransientApiError(row_number, f"HTTP {response.status_code}", maybe_created=True)
+                if response.status_code != 429:
+                    return row_number, payload, response, response.text
+                detail = f"HTTP {response.status_code}"
+            if attempt == self.max_retries:
+                break
+            delay = _retry_after(response)
+            if delay is None:
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(delay)
+        raise TransientApiError(row_number, detail)
+
+    def _write_rejects(self, rejects):
+        if not rejects:
+            return
+        with open(self.reject_path, 'a', encoding='utf-8') as f:
+            for reject in rejects:
+                f.write(json.dumps(reject, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _process_batch(self, executor, batch, rejects):
+        created = 0
+        for row_number, payload, response, error in executor.map(self._create, batch):
+            if error is None:
+                created += 1
+            else:
+                rejects.append({
+                    "row": row_number,
+                    "stage": "api",
+                    "status_code": response.status_code,
+                    "error": error,
+                    "data": payload
+                })
+        return created
+
+    def run(self, progress=None):
+        """Импорт с позиции checkpoint до конца файла; возвращает итоговое состояние"""
+        state = self.checkpoint.state
+        created, rejected = state['created'], state['rejected']
+        batch, rejects = [], []
+        last_row, last_offset = state['row'], state['offset']
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            def commit():
+                nonlocal created, rejected, batch, rejects
+                created += self._process_batch(executor, batch, rejects)
+                rejected += len(rejects)
+                self._write_rejects(rejects)
+                self.checkpoint.commit(source=os.path.abspath(self.source.path), row=last_row, offset=last_offset, created=created, rejected=rejected)
+                self.api.idempotency_store.maybe_compact()
+                batch, rejects = [], []
+                if progress is not None:
+                    progress(self.checkpoint.state)
+
+            for row_number, data, offset in self.source.rows(state['row'], state['offset']):
+                if isinstance(data, Exception):
+                    rejects.append({"row": row_number, "stage": "parse", "error": str(data)})
+                else:
+                    try:
+                        batch.append((row_number, validate_row(data)))
+                    except ValidationError as e:
+                        rejects.append({
+                            "row": row_number,
+                            "stage": "validation",
+                            "error": e.errors(include_url=False),
+                            "data": data
+                        })
+                last_row, last_offset = row_number, offset
+                if len(batch) + len(rejects) >= self.batch_size:
+                    commit()
+            if batch or rejects:
+                commit()
+
+        if self.api.idempotency_store.path:
+            self.api.idempotency_store.compact()
+        return self.checkpoint.state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Массовый импорт тикетов из CSV/JSONL')
+    parser.add_argument('source', help='CSV или JSONL файл с тикетами')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None)
+    parser.add_argument('--checkpoint', default=None, help='Файл прогресса (по умолчанию <source>.checkpoint)')
+    parser.add_argument('--rejects', default=None, help='Файл отклоненных строк (по умолчанию <source>.rejects.jsonl)')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Подбирать число одновременных запросов автоматически (до --workers)')
+    args = parser.parse_args(argv)
+
+    controller = AdaptiveConcurrencyController(max_limit=args.workers) if args.adaptive else None
+
+    importer = BulkImporter(
+        ApiClient(concurrency=controller),
+        TicketSource(args.source, args.format),
+        checkpoint_path=args.checkpoint or f"{args.source}.checkpoint",
+        reject_path=args.rejects or f"{args.source}.rejects.jsonl",
+        batch_size=args.batch_size,
+        workers=args.workers
+    )
+
+    def progress(s):
+        line = f"строка {s['row']}: создано {s['created']}, отклонено {s['rejected']}"
+        if controller is not None:
+            metrics = controller.metrics()
+            line += f", лимит {metrics['limit']}, p95 {metrics['p95_latency'] or 0:.3f}s"
+        print(line)
+
+    try:
+        state = importer.run(progress=progress)
+    except KeyboardInterrupt:
+        state = importer.checkpoint.state
+        print(f"⏸ Прервано, продолжение со строки {state['row'] + 1}")
+        return 130
+    except TransientApiError as e:
+        state = importer.checkpoint.state
+        print(f"⏸ Сервер недоступен ({e}), продолжение со строки {state['row'] + 1}")
+        return 75
+    print(f"✅ Импорт завершен: создано {state['created']}, отклонено {state['rejected']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
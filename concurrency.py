@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+def percentile(values, pct):
+    """Перцентиль по методу ближайшего ранга"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Slot:
+    """Занятый слот: момент начала запроса и был ли лимит исчерпан за время его жизни"""
+
+    __slots__ = ('started', 'saturated', 'epoch')
+
+    def __init__(self, started, saturated, epoch):
+        self.started = started
+        self.saturated = saturated
+        self.epoch = epoch
+
+
+class AdaptiveConcurrencyController:
+    """AIMD-ограничитель числа одновременных запросов
+
+    Пока ответы успешные и p95 задержки держится около базового уровня, лимит растет
+    примерно на 1 за каждые limit завершенных запросов - но только если лимит реально
+    был исчерпан, пока запрос выполнялся (при слабой нагрузке лимит не растет). На 429, 5xx,
+    сетевой ошибке или росте p95 лимит умножается на decrease_factor (не чаще раза в cooldown секунд).
+
+    Задержка оценивается не по отдельным запросам (медленные запросы бывают и у здорового
+    сервера), а по p95 последних window_size успешных ответов. Каждые min_samples ответов
+    он сравнивается с базовым p95, который медленно (baseline_alpha) следует за окном.
+    Рост считается перегрузкой, если p95 окна больше latency_tolerance * базового
+    и больше базового хотя бы на latency_floor секунд.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64, decrease_factor=0.5,
+                 latency_tolerance=2.0, latency_floor=0.05, baseline_alpha=0.1, window_size=200, min_samples=20,
+                 cooldown=1.0, max_decisions=1000):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor = latency_floor
+        self.baseline_alpha = baseline_alpha
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window_size)
+        self._since_check = 0
+        self._baseline_p95 = None
+        self._outcomes = deque(maxlen=window_size)
+        self._last_decrease_at = float('-inf')
+        self._increases = 0
+        self._decreases = 0
+        self.decisions = deque(maxlen=max_decisions)
+        # Увеличивается каждый раз, когда все слоты заняты или есть ожидающие
+        self._saturation_epoch = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self):
+        """Ожидание свободного слота; возвращает Slot для release"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._saturation_epoch += 1
+                self._condition.wait()
+            self._in_flight += 1
+            saturated = self._in_flight >= int(self._limit)
+            if saturated:
+                self._saturation_epoch += 1
+            return Slot(time.perf_counter(), saturated, self._saturation_epoch)
+
+    def release(self, slot, status_code=None, error=False):
+        """Освобождение слота с учетом результата запроса"""
+        latency = time.perf_counter() - slot.started
+        with self._condition:
+            saturated = slot.saturated or self._saturation_epoch != slot.epoch
+            self._in_flight -= 1
+            reason = self._overload_reason(latency, status_code, error)
+            self._outcomes.append(reason)
+            if reason is None:
+                if saturated:
+                    self._increase()
+            else:
+                self._decrease(reason)
+            self._condition.notify_all()
+        return latency
+
+    def _overload_reason(self, latency, status_code, error):
+        if error:
+            return 'error'
+        if status_code == 429:
+            return 'status_429'
+        if status_code is not None and status_code >= 500:
+            return f'status_{status_code}'
+        self._latencies.append(latency)
+        return self._latency_reason()
+
+    def _latency_reason(self):
+        """Проверка роста p95 окна раз в min_samples ответов (после заполнения окна)"""
+        self._since_check += 1
+        if len(self._latencies) < self._latencies.maxlen or self._since_check < self.min_samples:
+            return None
+        self._since_check = 0
+        recent_p95 = percentile(self._latencies, 95)
+        baseline = self._baseline_p95
+        if baseline is None:
+            self._baseline_p95 = recent_p95
+            return None
+        # Базовый уровень медленно догоняет устойчивое замедление, поэтому рост успевает снизить лимит
+        self._baseline_p95 = baseline + self.baseline_alpha * (recent_p95 - baseline)
+        if recent_p95 > self.latency_tolerance * baseline and recent_p95 - baseline > self.latency_floor:
+            return 'latency_rise'
+        return None
+
+    def _increase(self):
+        if self._limit >= self.max_limit:
+            return
+        previous = int(self._limit)
+        self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+        if int(self._limit) != previous:
+            self._increases += 1
+            self._record('increase', 'healthy')
+
+    def _decrease(self, reason):
+        now = time.monotonic()
+        if now - self._last_decrease_at < self.cooldown:
+            return
+        self._last_decrease_at = now
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._decreases += 1
+        self._record('decrease', reason)
+
+    def _record(self, action, reason):
+        self.decisions.append({
+            "time": time.time(),
+            "action": action,
+            "reason": reason,
+            "limit": int(self._limit)
+        })
+
+    def metrics(self):
+        """Текущий лимит и статистика окна"""
+        with self._condition:
+            errors = sum(1 for reason in self._outcomes if reason not in (None, 'latency_rise'))
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "p50_latency": percentile(self._latencies, 50),
+                "p95_latency": percentile(self._latencies, 95),
+                "baseline_p95_latency": self._baseline_p95,
+                "error_rate": errors / len(self._outcomes) if self._outcomes else 0.0,
+                "increases": self._increases,
+                "decreases": self._decreases
+            }
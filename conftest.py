@@ -1,18 +1,70 @@
+import time
+
+_CONFTEST_LOADED_AT = time.perf_counter()
+
 import pytest
 from api_client import ApiClient
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--accounts",
+        default=None,
+        help="JSON-файл с аккаунтами: тесты с фикстурой api запускаются для каждого аккаунта"
+    )
+    parser.addoption(
+        "--metrics-db",
+        default=None,
+        help="SQLite-файл для сохранения задержек запросов и длительностей тестов прогона"
+    )
+    parser.addoption("--metrics-label", default=None, help="Метка прогона в истории метрик")
+    parser.addoption(
+        "--startup-report",
+        action="store_true",
+        help="Показать время сбора тестов и какие тяжелые модули загружены при сборе"
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--startup-report"):
+        from startup_report import StartupReportPlugin
+
+        config.pluginmanager.register(StartupReportPlugin(_CONFTEST_LOADED_AT), StartupReportPlugin.name)
+
+    metrics_db = config.getoption("--metrics-db")
+    # При запуске через xdist метрики пишут воркеры, а не управляющий процесс
+    is_xdist_controller = not hasattr(config, "workerinput") and getattr(config.option, "numprocesses", None)
+    if metrics_db and not is_xdist_controller:
+        from run_metrics import MetricsStore, RunMetricsPlugin, RunRecorder
+
+        run_uid = getattr(config, "workerinput", {}).get("testrunuid")
+        recorder = RunRecorder(
+            MetricsStore(metrics_db), run_uid, config.getoption("--metrics-label"), ApiClient.DEFAULT_BASE_URL
+        )
+        config.pluginmanager.register(RunMetricsPlugin(recorder), RunMetricsPlugin.name)
+
+
+def pytest_generate_tests(metafunc):
+    accounts_path = metafunc.config.getoption("--accounts")
+    if accounts_path and "api" in metafunc.fixturenames:
+        from accounts import load_accounts
+
+        accounts = load_accounts(accounts_path)
+        metafunc.parametrize(
+            "api", accounts, indirect=True, scope="session", ids=[account.name for account in accounts]
+        )
+
+
 @pytest.fixture(scope="session")
-def api():
-    return ApiClient()
+def api(request):
+    account = getattr(request, "param", None)
+    client = account.build_client() if account is not None else ApiClient()
+    metrics_plugin = request.config.pluginmanager.get_plugin("run_metrics")
+    if metrics_plugin is not None:
+        metrics_plugin.recorder.attach(client)
+    return client
 
 
 @pytest.fixture(scope="session")
 def ref_data(api):
-    return {
-        "priorities": api.get_priorities(),
-        "types": api.get_types(),
-        "statuses": api.get_statuses(),
-        "departments": api.get_departments(),
-        "staff_users": api.get_staff_users()
-    }
\ No newline at end of file
+    return api.get_reference_data()
@@ -0,0 +1,312 @@
+import argparse
+import json
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from pydantic import ValidationError
+
+from api_client import ApiClient
+from ticket import TicketCreate
+
+
+def _sla_dates():
+    now = datetime.now()
+    return [
+        None, "",
+        (now + timedelta(days=30)).strftime('%d.%m.%Y %H:%M'),
+        (now + timedelta(hours=1)).strftime('%d.%m.%Y %H:%M'),
+        (now - timedelta(hours=1)).strftime('%d.%m.%Y %H:%M'),
+        "01.01.2020 12:00", "31.02.2030 10:00", "01.01.2030 24:00",
+        "2030-01-01 12:00", "01.01.2030", "1.1.2030 9:05", " 01.01.2030 12:00", "abc"
+    ]
+
+
+STRING_VALUES = ["", " ", "   ", "a", "Test", " padded ", "&", "<b>bold</b>", "Price < 100 > 50",
+                 "спец. символы !@#$%^", "\t\n", "x" * 256, "x" * 5000, "\u0000", "😀"]
+INT_VALUES = [None, 0, 1, 2, -1, 999999, 2 ** 31, -2 ** 31, "2", "-1", "abc", 1.5, True, False, ""]
+FIELD_VALUES = {
+    "pid": [None, "0", "1", "-1", "abc", "", "007", " 1", "1.5", "999999", 0, 5],
+    "status_id": [None, "open", "closed", "v-processe", "12", 12, "", "OPEN", -1],
+    "ticket_lock": [None, True, False, "true", 0, 1, "yes"],
+    "user_email": [None, "", "valid.email@example.com", "not-an-email", 5],
+    "cc": [None, [], ["cc1@example.com"], [""], "cc@example.com", [1]],
+    "bcc": [None, [], ["bcc@test.com"], "bcc@test.com"],
+    "followers": [None, [], [1], [999, 1000], [-1], ["1"], "1"],
+    "tags": [None, [], ["urgent", "test"], [""], "tag"],
+    "custom_fields": [None, {}, {"2": "12345"}, [], "x"],
+}
+INT_FIELDS = ('priority_id', 'type_id', 'department_id', 'owner_id', 'user_id', 'create_from_user')
+
+
+def generate_case(seed):
+    """Детерминированный payload по seed: случайный набор полей с граничными значениями"""
+    rng = random.Random(seed)
+    case = {}
+    for field in ('title', 'description'):
+        # Обязательные поля чаще присутствуют, чтобы проверять остальные правила
+        if rng.random() < 0.85:
+            case[field] = rng.choice(STRING_VALUES) if rng.random() < 0.4 else f"Fuzz {field} {seed}"
+    if rng.random() < 0.5:
+        case["sla_date"] = rng.choice(_sla_dates())
+    for field, values in FIELD_VALUES.items():
+        if rng.random() < 0.25:
+            case[field] = rng.choice(values)
+    for field in INT_FIELDS:
+        if rng.random() < 0.2:
+            case[field] = rng.choice(INT_VALUES)
+    return case
+
+
+def local_verdict(case):
+    """(принят ли payload моделью TicketCreate, поля с ошибками)"""
+    try:
+        TicketCreate(**case)
+    except ValidationError as e:
+        return False, sorted({str(error['loc'][0]) for error in e.errors() if error['loc']})
+    return True, []
+
+
+def _evaluate_seeds(seeds):
+    """Генерация и локальная проверка пачки seed'ов в процессе пула"""
+    return [(seed, local_verdict(generate_case(seed))[0]) for seed in seeds]
+
+
+class RequestBudget:
+    """Общий лимит запросов к серверу на весь прогон (None - без ограничения)"""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return float('inf') if self.limit is None else self.limit - self.used
+
+    def take(self):
+        """Списать один запрос; False, если лимит исчерпан"""
+        with self._lock:
+            if self.limit is not None and self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+def server_verdict(api, case, budget=None):
+    """True/False - сервер принял/отклонил payload, None - результат не определен
+    (в том числе если исчерпан лимит запросов)"""
+    if budget is not None and not budget.take():
+        return None
+    try:
+        response = api.create_ticket(case)
+    except Exception:
+        return None
+    if response.status_code == 200:
+        return True
+    if response.status_code == 400:
+        return False
+    return None
+
+
+def _simplifications(value):
+    """Строго более простые варианты значения (иначе уменьшение может зациклиться)"""
+    if isinstance(value, bool) or value is None:
+        return []
+    if isinstance(value, str):
+        candidates = ["", "a", value[:len(value) // 2], value.strip()]
+        return list(dict.fromkeys(candidate for candidate in candidates if len(candidate) < len(value)))
+    if isinstance(value, (int, float)):
+        candidates = [0, 1, -1, int(value)]
+        return list(dict.fromkeys(
+            candidate for candidate in candidates
+            if abs(candidate) < abs(value) or (candidate == value and type(candidate) is not type(value))
+        ))
+    if isinstance(value, list):
+        return [value[:i] + value[i + 1:] for i in range(len(value))]
+    if isinstance(value, dict):
+        return [{k: v for k, v in value.items() if k != key} for key in value]
+    return []
+
+
+def shrink(case, api, max_server_calls=200, server=None, budget=None):
+    """Жадное уменьшение payload, пока клиент и сервер продолжают расходиться
+
+    Сначала удаляются поля, затем упрощаются значения. Уже известный вердикт
+    сервера можно передать в server, чтобы не отправлять payload повторно.
+    Возвращает (минимальный payload, локальный вердикт, вердикт сервера).
+    """
+    local, _ = local_verdict(case)
+    calls = 0
+    if server is None:
+        server = server_verdict(api, case, budget)
+        calls = 1
+    improved = True
+    while improved and calls < max_server_calls and (budget is None or budget.remaining > 0):
+        improved = False
+        candidates = [{k: v for k, v in case.items() if k != key} for key in case]
+        candidates += [
+            {**case, key: simpler} for key, value in case.items() for simpler in _simplifications(value)
+        ]
+        for candidate in candidates:
+            candidate_local, _ = local_verdict(candidate)
+            if candidate_local != local:
+                continue
+            calls += 1
+            if server_verdict(api, candidate, budget) == server:
+                case, improved = candidate, True
+                break
+            if calls >= max_server_calls:
+                break
+    return case, local, server
+
+
+class FuzzReport:
+    def __init__(self):
+        self.generated = 0
+        self.locally_accepted = 0
+        self.sent = 0
+        self.inconclusive = 0
+        self.requests = 0
+        self.budget_exhausted = False
+        self.disagreements = []
+
+    def as_dict(self):
+        return {
+            "generated": self.generated,
+            "locally_accepted": self.locally_accepted,
+            "sent": self.sent,
+            "inconclusive": self.inconclusive,
+            "requests": self.requests,
+            "budget_exhausted": self.budget_exhausted,
+            "disagreements": self.disagreements
+        }
+
+
+def _signature(case, local):
+    """Ключ для группировки расхождений: набор полей и локальный вердикт"""
+    return local, tuple(sorted(case))
+
+
+def _covers(known, case, local, server):
+    """Payload содержит уже найденное минимальное воспроизведение с тем же исходом"""
+    if (known["client_accepts"], known["server_accepts"]) != (local, server):
+        return False
+    return all(key in case and case[key] == value for key, value in known["payload"].items())
+
+
+def run_fuzz(api, cases=10000, sample=200, seed=0, processes=None, batch_size=20, workers=4,
+             max_reproducers=20, chunk_size=500, max_requests=None):
+    """Генерация cases payload'ов, локальная проверка в пуле процессов,
+    отправка sample из них на сервер батчами и уменьшение расхождений
+
+    max_requests ограничивает общее число запросов (выборка и уменьшение вместе);
+    когда лимит исчерпан, прогон останавливается с тем, что уже найдено.
+    """
+    report = FuzzReport()
+    budget = RequestBudget(max_requests)
+    seeds = range(seed, seed + cases)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, cases, chunk_size)]
+    accepted, rejected = [], []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for results in pool.map(_evaluate_seeds, chunks):
+            for case_seed, verdict in results:
+                (accepted if verdict else rejected).append(case_seed)
+    report.generated = cases
+    report.locally_accepted = len(accepted)
+
+    # Поровну принятых и отклоненных локально, чтобы искать расхождения в обе стороны
+    rng = random.Random(seed)
+    half = sample // 2
+    sampled = rng.sample(accepted, min(half, len(accepted)))
+    sampled += rng.sample(rejected, min(sample - len(sampled), len(rejected)))
+
+    seen = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = 0
+        while start < len(sampled):
+            size = int(min(batch_size, budget.remaining))
+            if size <= 0:
+                break
+            batch = [generate_case(case_seed) for case_seed in sampled[start:start + size]]
+            start += size
+            verdicts = list(executor.map(lambda case: server_verdict(api, case, budget), batch))
+            report.sent += len(batch)
+            for case, server in zip(batch, verdicts):
+                if server is None:
+                    report.inconclusive += 1
+                    continue
+                local, _ = local_verdict(case)
+                if local == server or len(report.disagreements) >= max_reproducers:
+                    continue
+                if any(_covers(known, case, local, server) for known in report.disagreements):
+                    continue
+                minimal, _, _ = shrink(case, api, server=server, budget=budget)
+                signature = _signature(minimal, local)
+                if signature in seen:
+                    continue
+                seen.add(signature)
+                report.disagreements.append({
+                    "client_accepts": local,
+                    "server_accepts": server,
+                    "client_error_fields": local_verdict(minimal)[1],
+                    "payload": minimal
+                })
+    report.requests = budget.used
+    report.budget_exhausted = budget.remaining <= 0
+    return report
+
+
+def is_local_url(url):
+    """API поднят на этой машине (stub_server или локальный стенд)"""
+    return urlsplit(url).hostname in ('localhost', '127.0.0.1', '::1')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Фаззинг TicketCreate против API')
+    parser.add_argument('--base-url', default=None,
+                        help='API для проверки (по умолчанию поднимается локальный stub_server)')
+    parser.add_argument('--cases', type=int, default=10000)
+    parser.add_argument('--sample', type=int, default=200, help='Сколько payload отправить на сервер')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', default=None, help='JSON-файл с минимальными воспроизведениями')
+    parser.add_argument('--max-requests', type=int, default=1000,
+                        help='Лимит запросов к серверу на весь прогон, включая уменьшение')
+    parser.add_argument('--allow-remote', action='store_true',
+                        help='Разрешить фаззинг не локального API (создает тикеты на сервере)')
+    args = parser.parse_args(argv)
+    if args.base_url is not None and not is_local_url(args.base_url) and not args.allow_remote:
+        parser.error(f"{args.base_url} - не локальный API; для запуска против него укажите --allow-remote")
+
+    stub = None
+    if args.base_url is None:
+        from stub_server import StubHelpdesk
+
+        stub = StubHelpdesk().start()
+    try:
+        api = ApiClient(base_url=args.base_url or stub.base_url)
+        report = run_fuzz(api, cases=args.cases, sample=args.sample, seed=args.seed, processes=args.processes,
+                          max_requests=args.max_requests)
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(f"Сгенерировано {report.generated}, принято моделью {report.locally_accepted}, "
+          f"отправлено {report.sent}, без вердикта {report.inconclusive}, всего запросов {report.requests}")
+    if report.budget_exhausted:
+        print(f"Лимит --max-requests={args.max_requests} исчерпан, результаты могут быть неполными")
+    for disagreement in report.disagreements:
+        side = 'клиент принимает, сервер отклоняет' if disagreement['client_accepts'] else 'клиент отклоняет, сервер принимает'
+        print(f"❌ {side}: {json.dumps(disagreement['payload'], ensure_ascii=False)}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report.as_dict(), f, ensure_ascii=False, indent=2)
+    return 1 if report.disagreements else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def _file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 содержимого файла (читается потоково, кусками)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_idempotency_key(ticket_data, files=None):
+    """Детерминированный ключ идемпотентности для payload тикета"""
+    material = {"data": ticket_data}
+    if files:
+        # Разные файлы с одинаковым именем и размером должны давать разные ключи
+        material["files"] = [
+            [os.path.basename(str(path)), _file_digest(path)] for path in files
+        ]
+    canonical = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class IdempotencyStore:
+    """Ограниченная LRU-карта ключ → ID созданного тикета с опциональным сохранением на диск
+
+    Хранится только ID, а не весь ответ. Файл дописывается построчно и сжимается
+    до актуальных записей, когда в нем становится больше compact_factor * max_size строк.
+    """
+
+    def __init__(self, max_size=10000, path=None, compact_factor=2):
+        self.max_size = max_size
+        self.path = path
+        self.compact_factor = compact_factor
+        self._entries = OrderedDict()
+        self._file_lines = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                self._file_lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Недописанная строка после аварийного завершения
+                    continue
+                self._entries[entry['key']] = entry['id']
+                self._entries.move_to_end(entry['key'])
+                # Обрезаем сразу, чтобы память не зависела от размера файла
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def get(self, key):
+        """ID тикета, созданного с этим ключом (None, если ключ не найден)"""
+        with self._lock:
+            ticket_id = self._entries.get(key)
+            if ticket_id is not None:
+                self._entries.move_to_end(key)
+            return ticket_id
+
+    def put(self, key, ticket_id):
+        """Сохранение ID созданного тикета под ключом"""
+        with self._lock:
+            self._entries[key] = ticket_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "id": ticket_id}) + '\n')
+                self._file_lines += 1
+
+    def compact(self):
+        """Перезапись файла только актуальными записями"""
+        if not self.path:
+            return
+        with self._lock:
+            self._compact()
+
+    def maybe_compact(self):
+        """Сжатие файла, если он вырос больше compact_factor * max_size строк"""
+        if not self.path:
+            return
+        with self._lock:
+            if self._file_lines > self.compact_factor * self.max_size:
+                self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for key, ticket_id in self._entries.items():
+                f.write(json.dumps({"key": key, "id": ticket_id}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
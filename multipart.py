@@ -0,0 +1,183 @@
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import uuid
+
+
+class UploadStats:
+    """Метрики отправки multipart-тела"""
+
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.bytes_sent = 0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def throughput(self):
+        """Скорость отправки в байтах в секунду"""
+        elapsed = self.elapsed
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "total_bytes": self.total_bytes,
+            "bytes_sent": self.bytes_sent,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput
+        }
+
+
+def _quote(value):
+    """Экранирование значения для Content-Disposition (как в HTML form-data): ", CR, LF"""
+    return str(value).replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def flatten_fields(data, prefix=None):
+    """Преобразование payload тикета в пары (имя, значение) для формы"""
+    for key, value in data.items():
+        name = f"{prefix}[{key}]" if prefix else str(key)
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            yield from flatten_fields(value, name)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield f"{name}[]", _field_value(item)
+        else:
+            yield name, _field_value(value)
+
+
+def _field_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class MultipartBody:
+    """Потоковое multipart/form-data тело запроса
+
+    Файлы читаются с диска кусками по мере отправки (большие - через mmap),
+    поэтому в памяти одновременно находится не больше одного куска.
+    Длина известна заранее, так что requests отправляет Content-Length, а не chunked.
+    """
+
+    def __init__(self, fields, files, file_field='files[]', boundary=None,
+                 chunk_size=64 * 1024, mmap_threshold=8 * 1024 * 1024, progress=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.mmap_threshold = mmap_threshold
+        self.progress = progress
+        self._segments = []
+        self._lock = threading.Lock()
+
+        for name, value in flatten_fields(fields or {}):
+            self._segments.append(self._part_header(name) + value.encode('utf-8') + b'\r\n')
+        for path in files or []:
+            path = os.fspath(path)
+            filename = os.path.basename(path)
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            self._segments.append(self._part_header(file_field, filename, content_type))
+            self._segments.append((path, os.path.getsize(path)))
+            self._segments.append(b'\r\n')
+        self._segments.append(f"--{self.boundary}--\r\n".encode('ascii'))
+
+        self.length = sum(len(s) if isinstance(s, bytes) else s[1] for s in self._segments)
+        self.stats = UploadStats(self.length)
+        self._index = 0
+        self._offset = 0
+        self._source = None
+
+    def _part_header(self, name, filename=None, content_type=None):
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode('utf-8')
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _open(self, path, size):
+        f = open(path, 'rb')
+        if size >= self.mmap_threshold:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            return f, mapped
+        return f, None
+
+    def _close_source(self):
+        if self._source is not None:
+            f, mapped = self._source
+            if mapped is not None:
+                mapped.close()
+            f.close()
+            self._source = None
+
+    def _read_segment(self, size):
+        segment = self._segments[self._index]
+        if isinstance(segment, bytes):
+            chunk = segment[self._offset:self._offset + size]
+        else:
+            path, length = segment
+            if self._source is None:
+                self._source = self._open(path, length)
+            f, mapped = self._source
+            size = min(size, length - self._offset)
+            chunk = mapped[self._offset:self._offset + size] if mapped is not None else f.read(size)
+            if len(chunk) != size:
+                raise IOError(f'Файл {path} изменился во время отправки')
+        self._offset += len(chunk)
+        segment_length = len(segment) if isinstance(segment, bytes) else segment[1]
+        if self._offset >= segment_length:
+            self._close_source()
+            self._index += 1
+            self._offset = 0
+        return chunk
+
+    def read(self, size=-1):
+        """Чтение очередного куска тела (интерфейс файла для requests/http.client)"""
+        if size is None or size < 0:
+            size = self.length - self.stats.bytes_sent
+        with self._lock:
+            if self.stats.started_at is None:
+                self.stats.started_at = time.perf_counter()
+            parts = []
+            remaining = size
+            while remaining > 0 and self._index < len(self._segments):
+                chunk = self._read_segment(remaining)
+                parts.append(chunk)
+                remaining -= len(chunk)
+            data = b''.join(parts)
+            self.stats.bytes_sent += len(data)
+            if self._index >= len(self._segments) and self.stats.finished_at is None:
+                self.stats.finished_at = time.perf_counter()
+        if data and self.progress is not None:
+            self.progress(self.stats.bytes_sent, self.length)
+        return data
+
+    def close(self):
+        with self._lock:
+            self._close_source()
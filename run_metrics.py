@@ -0,0 +1,343 @@
+import argparse
+import math
+import re
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_uid TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    label TEXT,
+    base_url TEXT,
+    exit_status INTEGER
+);
+CREATE TABLE IF NOT EXISTS requests (
+    run_uid TEXT NOT NULL,
+    method TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    status_code INTEGER,
+    latency REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_uid TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requests_run ON requests (run_uid, endpoint);
+CREATE INDEX IF NOT EXISTS tests_run ON tests (run_uid, nodeid);
+"""
+
+
+def normalize_endpoint(url, base_url=None):
+    """Путь запроса без base_url, числовые сегменты заменены на {id}"""
+    path = urlsplit(url).path
+    if base_url:
+        base_path = urlsplit(base_url).path.rstrip('/')
+        if path.startswith(base_path):
+            path = path[len(base_path):]
+    return re.sub(r'/\d+(?=/|$)', '/{id}', path) or '/'
+
+
+class MetricsStore:
+    """SQLite-хранилище метрик прогонов"""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Воркеры xdist пишут в одну базу, поэтому ждем освобождения блокировки
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def start_run(self, run_uid, label=None, base_url=None):
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO runs (run_uid, started_at, label, base_url) VALUES (?, ?, ?, ?)",
+                (run_uid, time.time(), label, base_url)
+            )
+
+    def finish_run(self, run_uid, exit_status, requests, tests):
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT INTO requests (run_uid, method, endpoint, status_code, latency, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_uid, *row) for row in requests]
+            )
+            connection.executemany(
+                "INSERT INTO tests (run_uid, nodeid, outcome, duration) VALUES (?, ?, ?, ?)",
+                [(run_uid, *row) for row in tests]
+            )
+            connection.execute(
+                "UPDATE runs SET finished_at = MAX(COALESCE(finished_at, 0), ?), "
+                "exit_status = MAX(COALESCE(exit_status, 0), ?) WHERE run_uid = ?",
+                (time.time(), int(exit_status), run_uid)
+            )
+
+    def runs(self, limit=None):
+        """Завершенные прогоны, новые первыми"""
+        query = (
+            "SELECT r.run_uid, r.started_at, r.finished_at, r.label, r.exit_status, COUNT(q.latency) "
+            "FROM runs r LEFT JOIN requests q ON q.run_uid = r.run_uid "
+            "WHERE r.finished_at IS NOT NULL GROUP BY r.run_uid ORDER BY r.started_at DESC"
+        )
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as connection:
+            return [
+                {
+                    "run_uid": row[0],
+                    "started_at": row[1],
+                    "finished_at": row[2],
+                    "label": row[3],
+                    "exit_status": row[4],
+                    "requests": row[5],
+                    "throughput": row[5] / (row[2] - row[1]) if row[2] and row[2] > row[1] else 0.0
+                }
+                for row in connection.execute(query)
+            ]
+
+    def endpoint_latencies(self, run_uids):
+        """{(method, endpoint): [latency, ...]} для успешных запросов указанных прогонов"""
+        result = {}
+        if not run_uids:
+            return result
+        placeholders = ','.join('?' * len(run_uids))
+        with self._connect() as connection:
+            for method, endpoint, latency in connection.execute(
+                f"SELECT method, endpoint, latency FROM requests "
+                f"WHERE run_uid IN ({placeholders}) AND status_code IS NOT NULL AND status_code < 500",
+                list(run_uids)
+            ):
+                result.setdefault((method, endpoint), []).append(latency)
+        return result
+
+    def status_counts(self, run_uid):
+        with self._connect() as connection:
+            return dict(connection.execute(
+                "SELECT COALESCE(status_code, 0), COUNT(*) FROM requests WHERE run_uid = ? GROUP BY status_code",
+                (run_uid,)
+            ).fetchall())
+
+    def test_durations(self, run_uids):
+        """{nodeid: [duration, ...]} для прошедших тестов указанных прогонов"""
+        result = {}
+        if not run_uids:
+            return result
+        placeholders = ','.join('?' * len(run_uids))
+        with self._connect() as connection:
+            for nodeid, duration in connection.execute(
+                f"SELECT nodeid, duration FROM tests WHERE run_uid IN ({placeholders}) AND outcome = 'passed'",
+                list(run_uids)
+            ):
+                result.setdefault(nodeid, []).append(duration)
+        return result
+
+
+class RunRecorder:
+    """Сбор метрик одного прогона в памяти с записью в хранилище по завершении"""
+
+    def __init__(self, store, run_uid=None, label=None, base_url=None):
+        self.store = store
+        self.run_uid = run_uid or uuid.uuid4().hex
+        self.base_url = base_url
+        self._requests = []
+        self._tests = []
+        self._lock = threading.Lock()
+        store.start_run(self.run_uid, label, base_url)
+
+    def attach(self, api):
+        """Подписка на запросы клиента"""
+        api.request_listeners.append(
+            lambda method, url, status_code, elapsed: self.record_request(method, url, status_code, elapsed, api.base_url)
+        )
+
+    def record_request(self, method, url, status_code, elapsed, base_url=None):
+        endpoint = normalize_endpoint(url, base_url or self.base_url)
+        with self._lock:
+            self._requests.append((method, endpoint, status_code, elapsed, time.time()))
+
+    def record_test(self, nodeid, outcome, duration):
+        with self._lock:
+            self._tests.append((nodeid, outcome, duration))
+
+    def finish(self, exit_status=0):
+        with self._lock:
+            requests, tests = self._requests, self._tests
+            self._requests, self._tests = [], []
+        self.store.finish_run(self.run_uid, exit_status, requests, tests)
+
+
+class RunMetricsPlugin:
+    """pytest-плагин: длительности тестов и запросы клиента api попадают в историю"""
+
+    name = 'run_metrics'
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == 'call' or (report.when == 'setup' and not report.passed):
+            self.recorder.record_test(report.nodeid, report.outcome, report.duration)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.recorder.finish(exitstatus)
+
+
+def mann_whitney_greater(current, baseline):
+    """Односторонний U-тест Манна-Уитни (current больше baseline), нормальное приближение
+
+    Возвращает p-value; None, если выборки слишком малы для вывода.
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 < 3 or n2 < 3:
+        return None
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2.0 + 1
+        for k in range(i, j + 1):
+            ranks[k] = rank
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return None
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def find_regressions(store, run_uid=None, baseline_runs=10, alpha=0.01, min_ratio=1.1, z_threshold=3.0):
+    """Сравнение прогона с предыдущими baseline_runs прогонами
+
+    Эндпоинты сравниваются U-тестом по всем запросам, тесты - z-оценкой длительности.
+    Если прогона нет в базе, возвращается (None, []).
+    """
+    runs = store.runs()
+    if run_uid is None:
+        if not runs:
+            return None, []
+        run_uid = runs[0]['run_uid']
+    index = next((i for i, run in enumerate(runs) if run['run_uid'] == run_uid), None)
+    if index is None:
+        return None, []
+    baseline_uids = [run['run_uid'] for run in runs[index + 1:index + 1 + baseline_runs]]
+
+    findings = []
+    current = store.endpoint_latencies([run_uid])
+    baseline = store.endpoint_latencies(baseline_uids)
+    for key, latencies in sorted(current.items()):
+        previous = baseline.get(key, [])
+        if not previous:
+            continue
+        ratio = statistics.median(latencies) / statistics.median(previous)
+        p_value = mann_whitney_greater(latencies, previous)
+        findings.append({
+            "kind": "endpoint",
+            "name": f"{key[0]} {key[1]}",
+            "current_median": statistics.median(latencies),
+            "baseline_median": statistics.median(previous),
+            "ratio": ratio,
+            "p_value": p_value,
+            "samples": len(latencies),
+            "regression": p_value is not None and p_value < alpha and ratio >= min_ratio
+        })
+
+    current_tests = store.test_durations([run_uid])
+    baseline_tests = store.test_durations(baseline_uids)
+    for nodeid, durations in sorted(current_tests.items()):
+        previous = baseline_tests.get(nodeid, [])
+        if len(previous) < 3:
+            continue
+        mean, stdev = statistics.mean(previous), statistics.stdev(previous)
+        duration = durations[0]
+        z = (duration - mean) / stdev if stdev > 0 else (math.inf if duration > mean else 0.0)
+        ratio = duration / mean if mean > 0 else math.inf
+        findings.append({
+            "kind": "test",
+            "name": nodeid,
+            "current_median": duration,
+            "baseline_median": statistics.median(previous),
+            "ratio": ratio,
+            "z_score": z,
+            "samples": len(previous),
+            "regression": z > z_threshold and ratio >= min_ratio
+        })
+    return run_uid, findings
+
+
+def _format_time(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='История метрик прогонов и поиск регрессий задержки')
+    parser.add_argument('--db', default='metrics.db', help='SQLite-файл с метриками')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    history = subparsers.add_parser('history', help='Список последних прогонов')
+    history.add_argument('--last', type=int, default=20)
+
+    compare = subparsers.add_parser('compare', help='Сравнение прогона с предыдущими')
+    compare.add_argument('--run', default=None, help='run_uid (по умолчанию последний прогон)')
+    compare.add_argument('--baseline', type=int, default=10, help='Количество предыдущих прогонов')
+    compare.add_argument('--alpha', type=float, default=0.01)
+    compare.add_argument('--min-ratio', type=float, default=1.1, help='Минимальный рост медианы')
+    compare.add_argument('--all', action='store_true', help='Показывать и строки без регрессии')
+    args = parser.parse_args(argv)
+
+    store = MetricsStore(args.db)
+    if args.command == 'history':
+        for run in store.runs(args.last):
+            statuses = ', '.join(f"{code}: {count}" for code, count in sorted(store.status_counts(run['run_uid']).items()))
+            print(f"{_format_time(run['started_at'])}  {run['run_uid'][:12]}  {run['label'] or '-'}  "
+                  f"exit={run['exit_status']}  запросов={run['requests']} ({run['throughput']:.2f}/s)  [{statuses}]")
+        return 0
+
+    run_uid, findings = find_regressions(store, args.run, args.baseline, args.alpha, args.min_ratio)
+    if run_uid is None and args.run is not None:
+        print(f"Прогон {args.run} не найден в {args.db}", file=sys.stderr)
+        return 2
+    if run_uid is None:
+        print('В базе нет завершенных прогонов')
+        return 0
+    regressions = [finding for finding in findings if finding['regression']]
+    for finding in findings:
+        if not (args.all or finding['regression']):
+            continue
+        marker = '❌' if finding['regression'] else '  '
+        statistic = (f"p={finding['p_value']:.4f}" if finding.get('p_value') is not None
+                     else f"z={finding['z_score']:.2f}" if 'z_score' in finding else 'p=n/a')
+        print(f"{marker} {finding['name']}: {finding['baseline_median'] * 1000:.0f}ms → "
+              f"{finding['current_median'] * 1000:.0f}ms (x{finding['ratio']:.2f}, {statistic})")
+    print(f"Прогон {run_uid[:12]}: регрессий {len(regressions)} из {len(findings)} сравнений")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+HEAVY_MODULES = ('requests', 'pydantic', 'faker')
+
+
+def process_age():
+    """Сколько секунд назад запущен текущий процесс (по /proc); None, если /proc недоступен"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Имя процесса в скобках может содержать пробелы - поля считаются после него
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        # starttime - 22-е поле stat, в тиках с момента загрузки системы
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupReportPlugin:
+    """pytest-плагин: время от запуска процесса и от загрузки conftest до сбора тестов и до первого теста
+
+    Отсчет от запуска процесса включает старт интерпретатора и загрузку плагинов pytest,
+    которые выполняются до conftest; точность - тик ядра (обычно 10ms).
+    """
+
+    name = 'startup_report'
+
+    def __init__(self, started_at):
+        self.started_at = started_at
+        self.process_age_at_collection = None
+        self.collected_at = None
+        self.first_test_at = None
+        self.collected = 0
+        self.loaded_at_collection = []
+
+    def pytest_collection_finish(self, session):
+        self.collected_at = time.perf_counter()
+        self.process_age_at_collection = process_age()
+        self.collected = len(session.items)
+        # Что уже загружено к концу сбора - кандидаты на отложенный импорт
+        self.loaded_at_collection = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        if self.first_test_at is None:
+            self.first_test_at = time.perf_counter()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.write_sep('-', 'startup report')
+        if self.collected_at is not None:
+            if self.process_age_at_collection is not None:
+                terminalreporter.write_line(
+                    f"запуск процесса → конец сбора: {self.process_age_at_collection * 1000:.0f}ms"
+                )
+            else:
+                terminalreporter.write_line("запуск процесса → конец сбора: нет данных (/proc недоступен)")
+            terminalreporter.write_line(
+                f"conftest → конец сбора: {(self.collected_at - self.started_at) * 1000:.0f}ms "
+                f"({self.collected} тестов)"
+            )
+        if self.first_test_at is not None and self.collected_at is not None:
+            terminalreporter.write_line(
+                f"конец сбора → первый тест: {(self.first_test_at - self.collected_at) * 1000:.0f}ms"
+            )
+        loaded = ', '.join(self.loaded_at_collection) or 'нет'
+        deferred = ', '.join(name for name in HEAVY_MODULES if name not in self.loaded_at_collection) or 'нет'
+        terminalreporter.write_line(f"загружены при сборе: {loaded}; отложены: {deferred}")
+        terminalreporter.write_line("подробно по модулям: python -X importtime -m pytest --collect-only -q")
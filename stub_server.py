@@ -0,0 +1,204 @@
+import argparse
+import html
+import json
+import re
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATUSES = ["open", "closed", "v-processe"]
+STAFF_IDS = [1, 2]
+INT_FIELDS = ('priority_id', 'type_id', 'department_id', 'owner_id', 'user_id', 'create_from_user')
+
+
+class StubHelpdesk:
+    """Локальная замена helpdesk API для /tickets и справочников
+
+    Правила валидации повторяют наблюдаемое поведение реального сервера
+    (см. test_tickets_create.py): 400 с полем errors при ошибке, & экранируется.
+    Если задан webhook_url, после создания тикета через webhook_delay секунд
+    туда отправляется POST {"event": "ticket.created", "ticket": {...}}.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, webhook_url=None, webhook_delay=0.0):
+        self.latency = latency
+        self.webhook_url = webhook_url
+        self.webhook_delay = webhook_delay
+        self.tickets = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def validate(self, data):
+        """Ошибки валидации payload в формате {поле: сообщение}"""
+        errors = {}
+        for field in ('title', 'description'):
+            value = data.get(field)
+            if not isinstance(value, str) or not value.strip():
+                errors[field] = 'Поле является обязательным'
+
+        pid = data.get('pid', '0')
+        if str(pid) != '0':
+            if not re.fullmatch(r'\d+', str(pid)) or int(pid) not in self.tickets:
+                errors['pid'] = 'Родительская заявка не найдена'
+
+        sla_date = data.get('sla_date')
+        if sla_date not in (None, ''):
+            try:
+                if datetime.strptime(str(sla_date), '%d.%m.%Y %H:%M') <= datetime.now():
+                    errors['sla_date'] = 'Дата SLA должна быть в будущем'
+            except ValueError:
+                errors['sla_date'] = 'Неверный формат даты'
+
+        status_id = data.get('status_id', 'open')
+        if str(status_id) not in STATUSES:
+            errors['status_id'] = 'Статус не найден'
+
+        for field in INT_FIELDS:
+            value = data.get(field)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not re.fullmatch(r'\d+', str(value)):
+                errors[field] = 'Значение должно быть положительным числом'
+
+        followers = data.get('followers')
+        if followers is not None:
+            if not isinstance(followers, list) or any(follower not in STAFF_IDS for follower in followers):
+                errors['followers'] = 'Сотрудник не найден'
+        return errors
+
+    def create(self, data):
+        with self._lock:
+            ticket_id = self._next_id
+            self._next_id += 1
+            ticket = {
+                "id": ticket_id,
+                "pid": int(data.get('pid') or 0),
+                "title": html.escape(data['title'].strip(), quote=False),
+                "description": data['description'],
+                "status_id": str(data.get('status_id', 'open')),
+                "priority_id": int(data['priority_id']) if data.get('priority_id') is not None else 2,
+                "department_id": int(data['department_id']) if data.get('department_id') is not None else 1,
+                "user_email": data.get('user_email'),
+                "tags": data.get('tags') or [],
+                "date_created": datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+            }
+            self.tickets[ticket_id] = ticket
+        if self.webhook_url:
+            timer = threading.Timer(self.webhook_delay, self._send_webhook, args=(ticket,))
+            timer.daemon = True
+            timer.start()
+        return ticket
+
+    def _send_webhook(self, ticket):
+        body = json.dumps({"event": "ticket.created", "ticket": ticket}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            self.webhook_url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+        except OSError:
+            # Получатель недоступен - как и реальный сервер, повторно не отправляем
+            pass
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _path(self):
+                return self.path.split('?')[0].rstrip('/')
+
+            def do_GET(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                path = self._path()
+                match = re.fullmatch(r'/api/v2/tickets/(\d+)', path)
+                if match:
+                    ticket = stub.tickets.get(int(match.group(1)))
+                    if ticket is None:
+                        return self._send(404, {"errors": {"id": "Заявка не найдена"}})
+                    return self._send(200, {"data": ticket})
+                references = {
+                    '/api/v2/statuses': [{"id": status} for status in STATUSES],
+                    '/api/v2/staff': [{"id": staff_id} for staff_id in STAFF_IDS],
+                    '/api/v2/priorities': [{"id": 1}, {"id": 2}, {"id": 3}],
+                    '/api/v2/types': [{"id": 0}, {"id": 1}],
+                    '/api/v2/departments': [{"id": 1}]
+                }
+                if path in references:
+                    return self._send(200, {"data": references[path]})
+                self._send(404, {"errors": {"path": "Not found"}})
+
+            def do_POST(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self._path() != '/api/v2/tickets':
+                    return self._send(404, {"errors": {"path": "Not found"}})
+                try:
+                    data = json.loads(body or b'{}')
+                except ValueError:
+                    return self._send(400, {"errors": {"body": "Invalid JSON"}})
+                if not isinstance(data, dict):
+                    return self._send(400, {"errors": {"body": "Invalid JSON"}})
+                errors = stub.validate(data)
+                if errors:
+                    return self._send(400, {"errors": errors})
+                self._send(200, {"data": stub.create(data)})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Локальная замена helpdesk API')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Искусственная задержка ответа, с')
+    args = parser.parse_args(argv)
+
+    stub = StubHelpdesk(port=args.port, latency=args.latency).start()
+    print(f"Stub API: {stub.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
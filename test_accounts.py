@@ -0,0 +1,46 @@
+from accounts import AccountConfig, fan_out
+
+
+class TestAccountsFanOut:
+    """Тесты параллельного запуска по нескольким аккаунтам (без обращения к реальному API)"""
+
+    def test_clients_are_isolated_per_account(self, requests_mock):
+        """Каждый аккаунт получает свой base_url, сессию и кэш справочников"""
+        # Arrange
+        accounts = [
+            AccountConfig(name="first", base_url="https://first.example/api/v2"),
+            AccountConfig(name="second", base_url="https://second.example/api/v2"),
+        ]
+        for account in accounts:
+            requests_mock.get(f"{account.base_url}/priorities", json={"data": [account.name]})
+
+        def workload(client, account):
+            client.get_reference_data()
+            return client
+
+        # Act
+        results = fan_out(accounts, workload)
+
+        # Assert
+        first, second = results["first"].result, results["second"].result
+        assert first.session is not second.session
+        assert first.base_url == "https://first.example/api/v2"
+        assert first.get_reference_data()["priorities"] == {"data": ["first"]}
+        assert second.get_reference_data()["priorities"] == {"data": ["second"]}
+
+    def test_failure_of_one_account_does_not_stop_others(self):
+        """Ошибка в одном аккаунте попадает в его результат"""
+        accounts = [
+            AccountConfig(name="ok", base_url="https://ok.example/api/v2"),
+            AccountConfig(name="broken", base_url="https://broken.example/api/v2"),
+        ]
+
+        def workload(client, account):
+            if account.name == "broken":
+                raise RuntimeError("boom")
+            return "done"
+
+        results = fan_out(accounts, workload)
+
+        assert results["ok"].result == "done"
+        assert "boom" in results["broken"].error
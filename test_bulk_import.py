@@ -0,0 +1,154 @@
+import json
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from api_client import ApiClient
+from bulk_import import BulkImporter, TicketSource, TransientApiError
+
+
+def _read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestBulkImport:
+    """Тесты массового импорта тикетов (без обращения к реальному API)"""
+
+    def _importer(self, tmp_path, source_path, api=None, **kwargs):
+        return BulkImporter(
+            api or ApiClient(),
+            TicketSource(str(source_path)),
+            checkpoint_path=str(tmp_path / "import.checkpoint"),
+            reject_path=str(tmp_path / "rejects.jsonl"),
+            **kwargs
+        )
+
+    def test_csv_import_with_rejects(self, tmp_path, requests_mock):
+        """Валидные строки создаются, невалидные попадают в reject-файл"""
+        # Arrange
+        source = tmp_path / "tickets.csv"
+        source.write_text(
+            "title,description,priority_id,tags\n"
+            "First,Desc one,2,a;b\n"
+            "\"Multi\nline\",Desc two,,\n"
+            ",No title,,\n"
+            "Negative,Priority,-1,\n",
+            encoding='utf-8'
+        )
+        adapter = requests_mock.post("https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", json={"data": {"id": 1}})
+
+        # Act
+        state = self._importer(tmp_path, source, batch_size=2).run()
+
+        # Assert
+        assert state['created'] == 2
+        assert state['rejected'] == 2
+        assert adapter.request_history[0].json() == {
+            "title": "First", "description": "Desc one", "priority_id": 2, "tags": ["a", "b"]
+        }
+        assert [reject['row'] for reject in _read_jsonl(tmp_path / "rejects.jsonl")] == [3, 4]
+
+    def test_resume_after_interrupt(self, tmp_path, requests_mock):
+        """После прерывания импорт продолжается без повторного создания тикетов"""
+        # Arrange
+        source = tmp_path / "tickets.jsonl"
+        source.write_text(
+            "\n".join(json.dumps({"title": f"T{i}", "description": "D"}) for i in range(5)) + "\n",
+            encoding='utf-8'
+        )
+        adapter = requests_mock.post(
+            "https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", json={"data": {"id": 1}}
+        )
+        calls = []
+
+        class InterruptingClient(ApiClient):
+            def create_ticket(self, ticket_data, **kwargs):
+                calls.append(ticket_data['title'])
+                if ticket_data['title'] == "T3":
+                    raise KeyboardInterrupt
+                return super().create_ticket(ticket_data, **kwargs)
+
+        # Act
+        with pytest.raises(KeyboardInterrupt):
+            self._importer(tmp_path, source, api=InterruptingClient(), batch_size=2, workers=1).run()
+        interrupted_row = json.loads((tmp_path / "import.checkpoint").read_text())['row']
+        state = self._importer(tmp_path, source, batch_size=2, workers=1).run()
+
+        # Assert
+        assert interrupted_row == 2
+        assert state['row'] == 5
+        assert state['created'] == 5
+        titles = [request.json()['title'] for request in adapter.request_history]
+        assert titles == ["T0", "T1", "T2", "T3", "T4"]
+
+    def test_transient_errors_are_retried(self, tmp_path, requests_mock):
+        """429 и ошибка соединения повторяются и не попадают в reject-файл"""
+        # Arrange
+        source = tmp_path / "tickets.jsonl"
+        source.write_text(json.dumps({"title": "T", "description": "D"}) + "\n", encoding='utf-8')
+        refused = requests.exceptions.ConnectionError(
+            MaxRetryError(None, "/tickets", NewConnectionError(None, "Connection refused"))
+        )
+        adapter = requests_mock.post("https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", [
+            {"status_code": 429, "json": {}},
+            {"exc": refused},
+            {"status_code": 200, "json": {"data": {"id": 1}}},
+        ])
+
+        # Act
+        state = self._importer(tmp_path, source, backoff=0).run()
+
+        # Assert
+        assert adapter.call_count == 3
+        assert (state['created'], state['rejected']) == (1, 0)
+        assert not (tmp_path / "rejects.jsonl").exists()
+
+    def test_exhausted_retries_stop_without_commit(self, tmp_path, requests_mock):
+        """Если сервер так и не ответил, батч не фиксируется и будет отправлен при продолжении"""
+        source = tmp_path / "tickets.jsonl"
+        source.write_text(json.dumps({"title": "T", "description": "D"}) + "\n", encoding='utf-8')
+        requests_mock.post("https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", status_code=429, json={})
+
+        with pytest.raises(TransientApiError):
+            self._importer(tmp_path, source, max_retries=2, backoff=0).run()
+
+        assert json.loads((tmp_path / "import.checkpoint").read_text())['row'] == 0
+        assert not (tmp_path / "rejects.jsonl").exists()
+
+    @pytest.mark.parametrize("failure", [
+        {"status_code": 502, "json": {}},
+        {"exc": requests.exceptions.ConnectionError("Connection reset by peer")},
+    ], ids=["5xx", "reset"])
+    def test_possibly_processed_request_is_not_resent(self, tmp_path, requests_mock, failure):
+        """После 5xx или обрыва соединения POST не повторяется - тикет мог быть уже создан"""
+        source = tmp_path / "tickets.jsonl"
+        source.write_text(json.dumps({"title": "T", "description": "D"}) + "\n", encoding='utf-8')
+        adapter = requests_mock.post("https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", [
+            failure,
+            {"status_code": 200, "json": {"data": {"id": 1}}},
+        ])
+
+        with pytest.raises(TransientApiError) as error:
+            self._importer(tmp_path, source, backoff=0).run()
+
+        assert adapter.call_count == 1
+        assert error.value.maybe_created
+        assert json.loads((tmp_path / "import.checkpoint").read_text())['row'] == 0
+
+    def test_identical_rows_create_separate_tickets(self, tmp_path, requests_mock):
+        """Одинаковые строки файла - разные тикеты, а не ответ из хранилища"""
+        source = tmp_path / "tickets.jsonl"
+        source.write_text(json.dumps({"title": "Same", "description": "D"}) + "\n" +
+                          json.dumps({"title": "Same", "description": "D"}) + "\n", encoding='utf-8')
+        adapter = requests_mock.post(
+            "https://ooobnalshik.helpdeskeddy.com/api/v2/tickets", json={"data": {"id": 1}}
+        )
+
+        state = self._importer(tmp_path, source).run()
+
+        assert adapter.call_count == 2
+        assert state['created'] == 2
+        keys = {request.headers['Idempotency-Key'] for request in adapter.request_history}
+        assert len(keys) == 2
@@ -0,0 +1,128 @@
+import random
+import threading
+import time
+
+from api_client import ApiClient
+from concurrency import AdaptiveConcurrencyController
+
+
+class TestAdaptiveConcurrency:
+    """Тесты AIMD-ограничителя одновременных запросов"""
+
+    def test_limit_grows_while_saturated(self):
+        """При успешных ответах и занятых слотах лимит растет до max_limit"""
+        controller = AdaptiveConcurrencyController(initial_limit=2, max_limit=5)
+
+        for _ in range(100):
+            slots = [controller.acquire() for _ in range(int(controller.limit))]
+            for slot in slots:
+                controller.release(slot, 200)
+
+        assert controller.limit == 5
+        assert controller.metrics()['increases'] == 3
+
+    def test_limit_stays_under_light_load(self):
+        """Последовательные запросы не занимают весь лимит, и он не растет"""
+        controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=64)
+
+        for _ in range(200):
+            controller.release(controller.acquire(), 200)
+
+        assert controller.limit == 4
+        assert controller.metrics()['increases'] == 0
+
+    def test_limit_halves_on_429_with_cooldown(self):
+        """429 сокращает лимит вдвое, серия 429 в пределах cooldown - один раз"""
+        controller = AdaptiveConcurrencyController(initial_limit=16, cooldown=60)
+
+        for _ in range(5):
+            controller.release(controller.acquire(), 429)
+
+        assert controller.limit == 8
+        assert controller.decisions[-1]['reason'] == 'status_429'
+        assert controller.metrics()['error_rate'] == 1.0
+
+    def _release_with_latency(self, controller, latency):
+        slot = controller.acquire()
+        slot.saturated = True
+        slot.started -= latency
+        controller.release(slot, 200)
+
+    def test_heavy_tail_does_not_decrease_limit(self):
+        """Отдельные медленные запросы здорового сервера не считаются перегрузкой"""
+        controller = AdaptiveConcurrencyController(initial_limit=8, cooldown=0)
+        rng = random.Random(1)
+
+        for _ in range(20000):
+            self._release_with_latency(controller, rng.lognormvariate(-3, 1))
+
+        assert controller.metrics()['decreases'] == 0
+        assert controller.limit == 64
+
+    def test_sustained_latency_rise_decreases_limit(self):
+        """Устойчивый рост p95 относительно базового уровня сокращает лимит"""
+        controller = AdaptiveConcurrencyController(initial_limit=64, cooldown=60)
+        rng = random.Random(1)
+        for _ in range(1000):
+            self._release_with_latency(controller, rng.lognormvariate(-3, 1))
+
+        for _ in range(400):
+            self._release_with_latency(controller, 4 * rng.lognormvariate(-3, 1))
+
+        decreases = [decision for decision in controller.decisions if decision['action'] == 'decrease']
+        assert [decision['reason'] for decision in decreases] == ['latency_rise']
+        assert decreases[0]['limit'] == 32
+
+    def test_in_flight_never_exceeds_limit(self):
+        """Одновременно выполняется не больше limit запросов"""
+        controller = AdaptiveConcurrencyController(initial_limit=3, max_limit=3)
+        peak = []
+
+        def worker():
+            slot = controller.acquire()
+            peak.append(controller.in_flight)
+            time.sleep(0.01)
+            controller.release(slot, 200)
+
+        threads = [threading.Thread(target=worker) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) <= 3
+        assert controller.in_flight == 0
+
+    def test_client_retries_rejected_requests(self, requests_mock):
+        """429 повторяется клиентом, а контроллер при этом снижает лимит"""
+        controller = AdaptiveConcurrencyController(initial_limit=8)
+        api = ApiClient(concurrency=controller, max_retries=2, retry_backoff=0)
+        adapter = requests_mock.post(f"{api.base_url}/tickets", [
+            {"status_code": 429, "headers": {"Retry-After": "0"}},
+            {"status_code": 200, "json": {"data": {"id": 1}}},
+        ])
+
+        response = api.create_ticket({"title": "Busy"})
+
+        assert response.status_code == 200
+        assert adapter.call_count == 2
+        assert controller.limit == 4
+
+    def test_client_does_not_repeat_post_after_5xx(self, requests_mock):
+        """5xx на POST не повторяется даже с Idempotency-Key - сервер его не проверяет"""
+        api = ApiClient(max_retries=2, retry_backoff=0)
+        adapter = requests_mock.post(f"{api.base_url}/tickets", status_code=503)
+
+        response = api.create_ticket({"title": "Maybe created"}, idempotency_key="key-1")
+
+        assert response.status_code == 503
+        assert adapter.call_count == 1
+
+    def test_client_passes_timeout(self, requests_mock):
+        """Каждый запрос уходит с таймаутом клиента"""
+        api = ApiClient(timeout=5)
+        adapter = requests_mock.post(f"{api.base_url}/tickets", json={"data": {"id": 1}})
+
+        api.create_ticket({"title": "Timed"})
+
+        assert adapter.last_request.timeout == 5
@@ -1,9 +1,82 @@
 # utils/test_data_generator.py
-from faker import Faker
-from datetime import datetime, timedelta
+import argparse
+import json
+import os
 import random
 
-fake = Faker()
+# Faker и его локали загружаются только при первой генерации данных
+_fake = None
+_snapshot = None
+
+SNAPSHOT_ENV = 'TICKET_DATA_SNAPSHOT'
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.ticket_data_snapshot.json')
+
+
+def get_fake():
+    """Общий экземпляр Faker (создается при первом обращении)"""
+    global _fake
+    if _fake is None:
+        from faker import Faker
+
+        _fake = Faker()
+    return _fake
+
+
+def __getattr__(name):
+    # Совместимость со старым `from test_data_generator import fake`
+    if name == 'fake':
+        return get_fake()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build_snapshot(path=DEFAULT_SNAPSHOT_PATH, size=1000):
+    """Заранее сгенерированные пулы текстов и email для запуска без Faker"""
+    fake = get_fake()
+    snapshot = {
+        "texts": {
+            str(max_nb_chars): [fake.text(max_nb_chars=max_nb_chars) for _ in range(size)]
+            for max_nb_chars in (100, 150, 200)
+        },
+        "emails": [fake.email() for _ in range(size)]
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _load_snapshot():
+    """Пулы из snapshot-файла (TICKET_DATA_SNAPSHOT или файл по умолчанию); False, если его нет"""
+    global _snapshot
+    if _snapshot is None:
+        path = os.environ.get(SNAPSHOT_ENV, DEFAULT_SNAPSHOT_PATH)
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                _snapshot = json.load(f)
+        else:
+            _snapshot = False
+    return _snapshot
+
+
+def _random_number():
+    if _load_snapshot():
+        return random.randint(0, 999999999)
+    return get_fake().random_number()
+
+
+def _text(max_nb_chars):
+    snapshot = _load_snapshot()
+    if snapshot and str(max_nb_chars) in snapshot["texts"]:
+        return random.choice(snapshot["texts"][str(max_nb_chars)])
+    return get_fake().text(max_nb_chars=max_nb_chars)
+
+
+def _email():
+    snapshot = _load_snapshot()
+    if snapshot:
+        return random.choice(snapshot["emails"])
+    return get_fake().email()
 
 
 class TicketDataGenerator:
@@ -11,8 +84,8 @@ class TicketDataGenerator:
     def generate_valid_ticket_data():
         """Генерация валидных данных для создания тикета"""
         return {
-            "title": f"Test Ticket {fake.random_number()}",
-            "description": fake.text(max_nb_chars=200),
+            "title": f"Test Ticket {_random_number()}",
+            "description": _text(200),
             "priority_id": 2,
             "department_id": 1,
             "status_id": "open"
@@ -22,17 +95,32 @@ class TicketDataGenerator:
     def generate_minimal_ticket():
         """Генерация минимальных данных для создания тикета"""
         return {
-            "title": f"Minimal Ticket {fake.random_number()}",
-            "description": fake.text(max_nb_chars=100)
+            "title": f"Minimal Ticket {_random_number()}",
+            "description": _text(100)
         }
 
     @staticmethod
     def generate_ticket_with_emails():
         """Генерация данных с email адресами"""
         return {
-            "title": f"Email Test Ticket {fake.random_number()}",
-            "description": fake.text(max_nb_chars=150),
-            "user_email": fake.email(),
-            "cc": [fake.email() for _ in range(2)],
-            "bcc": [fake.email()]
-        }
\ No newline at end of file
+            "title": f"Email Test Ticket {_random_number()}",
+            "description": _text(150),
+            "user_email": _email(),
+            "cc": [_email() for _ in range(2)],
+            "bcc": [_email()]
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Snapshot пулов тестовых данных')
+    parser.add_argument('--build-snapshot', nargs='?', const=DEFAULT_SNAPSHOT_PATH, default=None, metavar='PATH')
+    parser.add_argument('--size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.build_snapshot:
+        print(f"Snapshot сохранен: {build_snapshot(args.build_snapshot, args.size)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
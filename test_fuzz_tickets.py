@@ -0,0 +1,64 @@
+import pytest
+
+from api_client import ApiClient
+from fuzz_tickets import generate_case, main, run_fuzz, shrink
+from stub_server import StubHelpdesk
+
+
+@pytest.fixture(scope="module")
+def stub_api():
+    with StubHelpdesk() as stub:
+        yield ApiClient(base_url=stub.base_url)
+
+
+class TestFuzzTickets:
+    """Тесты фаззинга TicketCreate против локального stub_server"""
+
+    def test_cases_are_reproducible(self):
+        """Один и тот же seed дает один и тот же payload"""
+        assert generate_case(42) == generate_case(42)
+
+    def test_shrink_to_minimal_reproducer(self, stub_api):
+        """Расхождение уменьшается до обязательных полей и причины"""
+        # Arrange: модель не проверяет, что дата SLA в будущем, а сервер проверяет
+        case = {
+            "title": "Long fuzz title",
+            "description": "Long fuzz description",
+            "sla_date": "01.01.2020 12:00",
+            "tags": ["urgent", "test"],
+            "priority_id": 2
+        }
+
+        # Act
+        minimal, client_accepts, server_accepts = shrink(case, stub_api)
+
+        # Assert
+        assert (client_accepts, server_accepts) == (True, False)
+        assert minimal == {"title": "a", "description": "a", "sla_date": "01.01.2020 12:00"}
+
+    def test_run_fuzz_reports_disagreements(self, stub_api):
+        """Фаззинг находит известное расхождение клиента и сервера"""
+        report = run_fuzz(stub_api, cases=2000, sample=100, processes=2)
+
+        assert report.generated == 2000
+        assert report.sent == 100
+        assert report.disagreements
+        assert all(
+            disagreement["client_accepts"] != disagreement["server_accepts"]
+            for disagreement in report.disagreements
+        )
+
+    def test_max_requests_caps_whole_run(self, stub_api):
+        """Лимит запросов общий для выборки и уменьшения расхождений"""
+        report = run_fuzz(stub_api, cases=2000, sample=100, processes=2, max_requests=30)
+
+        assert report.requests == 30
+        assert report.sent <= 30
+        assert report.budget_exhausted
+
+    def test_remote_url_requires_flag(self):
+        """Без --allow-remote фаззинг не запускается против внешнего API"""
+        with pytest.raises(SystemExit) as error:
+            main(["--base-url", "https://example.helpdeskeddy.com/api/v2", "--cases", "10"])
+
+        assert error.value.code == 2
@@ -0,0 +1,96 @@
+from api_client import ApiClient
+from idempotency import IdempotencyStore, make_idempotency_key
+
+
+class TestIdempotency:
+    """Тесты дедупликации создания тикетов (без обращения к реальному API)"""
+
+    def test_key_is_deterministic(self):
+        """Ключ не зависит от порядка полей payload"""
+        first = make_idempotency_key({"title": "A", "description": "B"})
+        second = make_idempotency_key({"description": "B", "title": "A"})
+        other = make_idempotency_key({"title": "A", "description": "C"})
+
+        assert first == second
+        assert first != other
+
+    def test_store_evicts_least_recently_used(self):
+        """LRU-хранилище вытесняет давно не использованные ключи"""
+        store = IdempotencyStore(max_size=2)
+        store.put("a", 1)
+        store.put("b", 2)
+        store.get("a")
+        store.put("c", 3)
+
+        assert "a" in store
+        assert "b" not in store
+        assert len(store) == 2
+
+    def test_store_persists_to_disk(self, tmp_path):
+        """Записи переживают перезапуск процесса"""
+        path = tmp_path / "keys.jsonl"
+        IdempotencyStore(path=str(path)).put("a", 1)
+
+        reloaded = IdempotencyStore(path=str(path))
+
+        assert reloaded.get("a") == 1
+
+    def test_store_file_is_bounded(self, tmp_path):
+        """Файл периодически сжимается, при загрузке в памяти не больше max_size записей"""
+        path = tmp_path / "keys.jsonl"
+        store = IdempotencyStore(max_size=10, path=str(path))
+        for i in range(100):
+            store.put(f"key-{i}", i)
+            store.maybe_compact()
+
+        reloaded = IdempotencyStore(max_size=5, path=str(path))
+
+        assert len(path.read_text().splitlines()) <= 20
+        assert len(reloaded) == 5
+        assert reloaded.get("key-99") == 99
+
+    def test_resubmission_returns_cached_ticket(self, requests_mock):
+        """Повторная отправка того же payload не создает второй тикет"""
+        # Arrange
+        api = ApiClient(idempotency_store=IdempotencyStore())
+        adapter = requests_mock.post(f"{api.base_url}/tickets", json={"data": {"id": 42, "title": "Retry"}})
+        ticket_data = {"title": "Retry", "description": "Retried request"}
+
+        # Act
+        first = api.create_ticket(ticket_data)
+        second = api.create_ticket(dict(ticket_data))
+
+        # Assert
+        assert adapter.call_count == 1
+        assert adapter.last_request.headers['Idempotency-Key'] == first.idempotency_key
+        assert second.idempotent_replay
+        assert second.json()['data']['id'] == 42
+
+    def test_failed_creation_is_not_cached(self, requests_mock):
+        """Ответ с ошибкой не попадает в хранилище"""
+        api = ApiClient(idempotency_store=IdempotencyStore())
+        adapter = requests_mock.post(f"{api.base_url}/tickets", status_code=400, json={"errors": {}})
+        ticket_data = {"title": "Broken"}
+
+        api.create_ticket(ticket_data)
+        api.create_ticket(ticket_data)
+
+        assert adapter.call_count == 2
+
+    def test_no_header_without_store(self, requests_mock):
+        """Без хранилища и явного ключа заголовок Idempotency-Key не отправляется"""
+        api = ApiClient()
+        adapter = requests_mock.post(f"{api.base_url}/tickets", json={"data": {"id": 1}})
+
+        api.create_ticket({"title": "Fresh", "description": "Every run"})
+
+        assert 'Idempotency-Key' not in adapter.last_request.headers
+
+    def test_key_depends_on_file_content(self, tmp_path):
+        """Файлы с одинаковым именем и размером, но разным содержимым дают разные ключи"""
+        first, second = tmp_path / "a" / "report.txt", tmp_path / "b" / "report.txt"
+        for path, content in ((first, b"aaaa"), (second, b"bbbb")):
+            path.parent.mkdir()
+            path.write_bytes(content)
+
+        assert make_idempotency_key({"title": "T"}, [first]) != make_idempotency_key({"title": "T"}, [second])
@@ -0,0 +1,93 @@
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from api_client import ApiClient
+from multipart import MultipartBody
+
+
+@pytest.fixture
+def upload_server():
+    """Локальный сервер, сохраняющий принятые multipart-запросы"""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            received.append((self.headers, body))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{"data": {"id": 7}}')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", received
+    server.shutdown()
+    server.server_close()
+
+
+def _parse_multipart(headers, body):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body
+    )
+    return {part.get_param('name', header='content-disposition'): part for part in message.iter_parts()}
+
+
+class TestMultipartUpload:
+    """Тесты потоковой отправки вложений (локальный сервер вместо реального API)"""
+
+    def test_body_length_matches_streamed_bytes(self, tmp_path):
+        """Заявленная длина совпадает с фактически прочитанными байтами"""
+        attachment = tmp_path / "big.bin"
+        attachment.write_bytes(b"x" * 300_000)
+        body = MultipartBody({"title": "T", "tags": ["a", "b"]}, [attachment], chunk_size=4096, mmap_threshold=1024)
+
+        streamed = b"".join(body)
+
+        assert len(streamed) == len(body)
+        assert body.stats.bytes_sent == len(body)
+        assert body.stats.finished_at is not None
+
+    def test_filename_cannot_inject_headers(self, tmp_path):
+        """Кавычки и переводы строк в имени файла экранируются и не ломают заголовок части"""
+        attachment = tmp_path / 'a"b\r\nX-Injected: 1.txt'
+        attachment.write_bytes(b"data")
+
+        streamed = b"".join(MultipartBody({"title": "T"}, [attachment]))
+
+        assert b'filename="a%22b%0D%0AX-Injected: 1.txt"' in streamed
+        assert b"\r\nX-Injected" not in streamed
+
+    def test_create_ticket_with_files(self, upload_server, tmp_path):
+        """Тикет с вложением отправляется как multipart/form-data"""
+        # Arrange
+        base_url, received = upload_server
+        api = ApiClient(base_url=base_url)
+        attachment = tmp_path / "report.txt"
+        attachment.write_bytes(b"attachment content\n" * 1000)
+        progress = []
+
+        # Act
+        response = api.create_ticket(
+            {"title": "With file", "description": "Has attachment", "tags": ["one", "two"]},
+            files=[attachment],
+            progress=lambda sent, total: progress.append((sent, total))
+        )
+
+        # Assert
+        assert response.status_code == 200
+        headers, body = received[0]
+        assert headers['Content-Type'].startswith('multipart/form-data; boundary=')
+        parts = _parse_multipart(headers, body)
+        assert parts['title'].get_content() == "With file"
+        assert parts['files[]'].get_filename() == "report.txt"
+        assert parts['files[]'].get_payload(decode=True) == attachment.read_bytes()
+        assert progress[-1][0] == progress[-1][1] == response.upload_stats.total_bytes
@@ -0,0 +1,54 @@
+from run_metrics import MetricsStore, RunRecorder, find_regressions, main, mann_whitney_greater, normalize_endpoint
+
+BASE_URL = "https://example.helpdeskeddy.com/api/v2"
+
+
+class TestRunMetrics:
+    """Тесты истории метрик прогонов"""
+
+    def _record_run(self, store, latency, count=20):
+        recorder = RunRecorder(store, base_url=BASE_URL)
+        for i in range(count):
+            recorder.record_request("POST", f"{BASE_URL}/tickets", 200, latency + i * 0.001)
+            recorder.record_request("GET", f"{BASE_URL}/priorities", 200, 0.05 + i * 0.001)
+        recorder.record_test("test_tickets_create.py::test_one", "passed", latency * count)
+        recorder.finish(0)
+        return recorder.run_uid
+
+    def test_normalize_endpoint(self):
+        """Идентификаторы в пути сворачиваются в {id}"""
+        assert normalize_endpoint(f"{BASE_URL}/tickets/123", BASE_URL) == "/tickets/{id}"
+        assert normalize_endpoint(f"{BASE_URL}/tickets?page=2", BASE_URL) == "/tickets"
+
+    def test_mann_whitney_detects_shift(self):
+        """U-тест различает сдвинутые выборки и не реагирует на одинаковые"""
+        baseline = [0.1 + i * 0.001 for i in range(30)]
+
+        assert mann_whitney_greater([value + 0.1 for value in baseline], baseline) < 0.001
+        assert mann_whitney_greater(baseline, baseline) > 0.4
+
+    def test_regression_flagged_against_history(self, tmp_path):
+        """Замедление /tickets помечается как регрессия, справочники - нет"""
+        # Arrange
+        store = MetricsStore(str(tmp_path / "metrics.db"))
+        for _ in range(3):
+            self._record_run(store, latency=0.2)
+        run_uid = self._record_run(store, latency=0.5)
+
+        # Act
+        compared_uid, findings = find_regressions(store, baseline_runs=3)
+
+        # Assert
+        assert compared_uid == run_uid
+        regressions = {finding['name'] for finding in findings if finding['regression']}
+        assert regressions == {"POST /tickets", "test_tickets_create.py::test_one"}
+        assert store.runs(1)[0]['requests'] == 40
+
+    def test_unknown_run_is_reported(self, tmp_path, capsys):
+        """Несуществующий run_uid - понятное сообщение и ненулевой код выхода"""
+        db = str(tmp_path / "metrics.db")
+        self._record_run(MetricsStore(db), latency=0.2)
+
+        assert find_regressions(MetricsStore(db), run_uid="missing") == (None, [])
+        assert main(["--db", db, "compare", "--run", "missing"]) == 2
+        assert "не найден" in capsys.readouterr().err
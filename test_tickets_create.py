@@ -1,8 +1,5 @@
 import pytest
-import requests
 from datetime import datetime, timedelta
-from ticket import TicketCreate
-from test_data_generator import TicketDataGenerator
 
 
 class TestTicketCreate:
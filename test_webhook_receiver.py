@@ -0,0 +1,74 @@
+import time
+
+from api_client import ApiClient
+from stub_server import StubHelpdesk
+from webhook_receiver import E2ELatencyTracker, WebhookReceiver
+
+
+class TestWebhookLatency:
+    """Тесты сквозной задержки через локальный приемник уведомлений и stub_server"""
+
+    def test_end_to_end_latency_is_measured(self):
+        """Каждое уведомление сопоставляется с тикетом, задержка включает доставку"""
+        # Arrange
+        tracker = E2ELatencyTracker()
+        with WebhookReceiver(on_event=tracker.on_event) as receiver:
+            with StubHelpdesk(webhook_url=receiver.url, webhook_delay=0.05) as stub:
+                api = ApiClient(base_url=stub.base_url)
+
+                # Act
+                for i in range(5):
+                    tracker.create_ticket(api, {"title": f"E2E {i}", "description": "probe"})
+                delivered = tracker.wait(timeout=5)
+
+        # Assert
+        report = tracker.report()
+        assert delivered
+        assert report["created"] == report["delivered"] == 5
+        assert report["end_to_end"]["p50"] >= 0.05
+        assert report["end_to_end"]["max"] >= report["post_latency"]["max"]
+
+    def test_webhook_before_post_response_is_matched_by_tag(self, requests_mock):
+        """Уведомление, пришедшее раньше ответа на POST, сопоставляется после создания"""
+        # Arrange
+        tracker = E2ELatencyTracker()
+        api = ApiClient(base_url="https://example.helpdeskeddy.com/api/v2")
+
+        def early_webhook(request, context):
+            title = request.json()["title"]
+            tracker.on_event({"arrived_at": time.perf_counter(), "payload": {"id": 7}, "raw": title})
+            return {"data": {"id": 7, "title": title}}
+
+        requests_mock.post(f"{api.base_url}/tickets", json=early_webhook)
+
+        # Act
+        tracker.create_ticket(api, {"title": "Early", "description": "probe"})
+
+        # Assert
+        report = tracker.report()
+        assert report["delivered"] == 1
+        assert report["webhook_delay"]["max"] <= 0
+
+    def test_foreign_events_are_not_retained(self):
+        """Уведомления, которые не могут совпасть ни с одним тикетом, не накапливаются"""
+        tracker = E2ELatencyTracker(max_unmatched=10)
+
+        for i in range(100):
+            tracker.on_event({"arrived_at": time.perf_counter(), "payload": {"id": i}, "raw": f"other {i}"})
+
+        assert len(tracker._unmatched) == 0
+        assert tracker.report()["dropped_events"] == 100
+
+    def test_non_json_success_is_not_created(self, requests_mock):
+        """200 с телом не в JSON не роняет прогон, тикет считается не созданным"""
+        tracker = E2ELatencyTracker()
+        api = ApiClient(base_url="https://example.helpdeskeddy.com/api/v2")
+        requests_mock.post(f"{api.base_url}/tickets", text="<html>Gateway</html>")
+
+        response = tracker.create_ticket(api, {"title": "Proxy", "description": "probe"})
+
+        report = tracker.report()
+        assert response.status_code == 200
+        assert (report["sent"], report["created"]) == (1, 0)
+        assert next(iter(tracker.tickets.values()))["error"] == "invalid JSON"
+        assert tracker.wait(timeout=0)
@@ -0,0 +1,277 @@
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+from concurrency import percentile
+
+TAG_PATTERN = re.compile(r'\[e2e:([0-9a-f]{12})\]')
+
+
+def _find_ticket_id(payload):
+    """ID тикета из уведомления: id, ticket.id, data.id или ticket_id на любом уровне"""
+    if isinstance(payload, dict):
+        for key in ('ticket_id', 'id'):
+            if isinstance(payload.get(key), (int, str)) and str(payload[key]).isdigit():
+                return int(payload[key])
+        for key in ('ticket', 'data'):
+            if key in payload:
+                found = _find_ticket_id(payload[key])
+                if found is not None:
+                    return found
+    return None
+
+
+class WebhookReceiver:
+    """Локальный HTTP-приемник уведомлений: фиксирует время прихода каждого POST
+
+    События не хранятся - каждое сразу передается в on_event.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, on_event=None):
+        self.on_event = on_event
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/webhook"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                arrived_at = time.perf_counter()
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                text = body.decode('utf-8', errors='replace')
+                try:
+                    payload = json.loads(text)
+                except ValueError:
+                    payload = dict(parse_qsl(text))
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                event = {"arrived_at": arrived_at, "payload": payload, "raw": text}
+                if receiver.on_event is not None:
+                    receiver.on_event(event)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class E2ELatencyTracker:
+    """Сопоставление созданных тикетов с уведомлениями и расчет сквозной задержки
+
+    Тикет помечается тегом [e2e:<hex>] в title; уведомление сопоставляется
+    по ID тикета или по тегу, если ID в нем нет.
+
+    Уведомление, пришедшее раньше ответа на POST, ждет сопоставления не дольше
+    unmatched_ttl секунд, и таких уведомлений хранится не больше max_unmatched.
+    Уведомления, которые уже не могут совпасть ни с одним тикетом, отбрасываются сразу.
+    """
+
+    def __init__(self, max_unmatched=1000, unmatched_ttl=60.0):
+        self.tickets = {}
+        self.unmatched_ttl = unmatched_ttl
+        self.dropped_events = 0
+        self._by_id = {}
+        self._awaiting_response = 0
+        self._unmatched = deque(maxlen=max_unmatched)
+        self._condition = threading.Condition()
+
+    def create_ticket(self, api, ticket_data):
+        """Создание тикета с тегом корреляции и фиксацией времени отправки"""
+        tag = uuid.uuid4().hex[:12]
+        data = dict(ticket_data, title=f"{ticket_data.get('title', '')} [e2e:{tag}]")
+        sent_at = time.perf_counter()
+        with self._condition:
+            self.tickets[tag] = {"tag": tag, "id": None, "sent_at": sent_at, "created_at": None, "arrived_at": None}
+            self._awaiting_response += 1
+        try:
+            response = api.create_ticket(data)
+        except Exception:
+            with self._condition:
+                self._awaiting_response -= 1
+                self.tickets[tag]["error"] = "request failed"
+            raise
+        created_at = time.perf_counter()
+        ticket_id = None
+        error = None
+        if response.status_code == 200:
+            try:
+                ticket_id = _find_ticket_id(api._extract_ticket_data(response.json()))
+            except ValueError:
+                # 200 с телом не в JSON (страница прокси, обрезанный ответ) - тикет не считается созданным
+                error = "invalid JSON"
+        with self._condition:
+            self._awaiting_response -= 1
+            record = self.tickets[tag]
+            record.update(id=ticket_id, created_at=created_at, status_code=response.status_code, error=error)
+            if ticket_id is not None:
+                self._by_id[ticket_id] = tag
+            # Уведомление могло прийти раньше, чем вернулся ответ на POST
+            for event in list(self._unmatched):
+                if self._match(event) is record:
+                    self._unmatched.remove(event)
+                    record["arrived_at"] = event["arrived_at"]
+            self._prune(created_at)
+            self._condition.notify_all()
+        return response
+
+    def _match(self, event):
+        ticket_id = _find_ticket_id(event["payload"])
+        if ticket_id is not None and ticket_id in self._by_id:
+            return self.tickets[self._by_id[ticket_id]]
+        found = TAG_PATTERN.search(event["raw"])
+        if found and found.group(1) in self.tickets:
+            return self.tickets[found.group(1)]
+        return None
+
+    def _can_match_later(self, event):
+        """Уведомление еще может совпасть с тикетом, ответ на который не получен"""
+        found = TAG_PATTERN.search(event["raw"])
+        if found:
+            return found.group(1) in self.tickets
+        # Без тега остается сопоставление по ID, который станет известен после ответа
+        return self._awaiting_response > 0
+
+    def _prune(self, now):
+        while self._unmatched and now - self._unmatched[0]["arrived_at"] > self.unmatched_ttl:
+            self._unmatched.popleft()
+            self.dropped_events += 1
+        if not self._awaiting_response:
+            self.dropped_events += len(self._unmatched)
+            self._unmatched.clear()
+
+    def on_event(self, event):
+        """Обработчик для WebhookReceiver(on_event=...)"""
+        with self._condition:
+            record = self._match(event)
+            if record is None or record["created_at"] is None:
+                if self._can_match_later(event):
+                    if len(self._unmatched) == self._unmatched.maxlen:
+                        self.dropped_events += 1
+                    self._unmatched.append(event)
+                else:
+                    self.dropped_events += 1
+            elif record["arrived_at"] is None:
+                record["arrived_at"] = event["arrived_at"]
+            self._prune(event["arrived_at"])
+            self._condition.notify_all()
+
+    def wait(self, timeout=30.0):
+        """Ожидание уведомлений по всем успешно созданным тикетам"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                pending = [
+                    record for record in self.tickets.values()
+                    if record["id"] is not None and record["arrived_at"] is None
+                ]
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    return not pending
+                self._condition.wait(remaining)
+
+    def report(self):
+        """Распределения задержек POST, доставки уведомления и сквозной задержки (в секундах)"""
+        with self._condition:
+            created = [record for record in self.tickets.values() if record["id"] is not None]
+            delivered = [record for record in created if record["arrived_at"] is not None]
+
+        def distribution(values):
+            return {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": max(values) if values else None
+            }
+
+        return {
+            "sent": len(self.tickets),
+            "created": len(created),
+            "delivered": len(delivered),
+            "missing": len(created) - len(delivered),
+            "dropped_events": self.dropped_events,
+            "post_latency": distribution([r["created_at"] - r["sent_at"] for r in created]),
+            "webhook_delay": distribution([r["arrived_at"] - r["created_at"] for r in delivered]),
+            "end_to_end": distribution([r["arrived_at"] - r["sent_at"] for r in delivered])
+        }
+
+
+def _format_distribution(name, values):
+    if values["p50"] is None:
+        return f"{name}: нет данных"
+    return (f"{name}: p50 {values['p50'] * 1000:.0f}ms, p95 {values['p95'] * 1000:.0f}ms, "
+            f"p99 {values['p99'] * 1000:.0f}ms, max {values['max'] * 1000:.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сквозная задержка: создание тикета → уведомление')
+    parser.add_argument('--base-url', default=None,
+                        help='API для проверки (по умолчанию stub_server, отправляющий уведомления)')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес приемника уведомлений')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=60.0, help='Ожидание уведомлений, с')
+    args = parser.parse_args(argv)
+
+    from api_client import ApiClient
+
+    tracker = E2ELatencyTracker()
+    stub = None
+    with WebhookReceiver(args.host, args.port, on_event=tracker.on_event) as receiver:
+        print(f"Приемник уведомлений: {receiver.url}")
+        if args.base_url is None:
+            from stub_server import StubHelpdesk
+
+            stub = StubHelpdesk(webhook_url=receiver.url, webhook_delay=0.05).start()
+        try:
+            api = ApiClient(base_url=args.base_url or stub.base_url)
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(
+                    lambda i: tracker.create_ticket(api, {"title": f"E2E latency {i}", "description": "E2E latency probe"}),
+                    range(args.count)
+                ))
+            tracker.wait(args.timeout)
+        finally:
+            if stub is not None:
+                stub.stop()
+
+    report = tracker.report()
+    print(f"Отправлено {report['sent']}, создано {report['created']}, "
+          f"уведомлений {report['delivered']}, без уведомления {report['missing']}, "
+          f"отброшено чужих уведомлений {report['dropped_events']}")
+    print(_format_distribution("POST /tickets", report["post_latency"]))
+    print(_format_distribution("Доставка уведомления", report["webhook_delay"]))
+    print(_format_distribution("Сквозная задержка", report["end_to_end"]))
+    return 1 if report['missing'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())